@@ -0,0 +1,76 @@
+"""
+Load test for the API server: throughput and latency at increasing concurrency.
+
+Usage:
+    python scripts/load_test.py --url http://localhost:8000 --path "/api/nba?fresh=true"
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, requests: int) -> Dict:
+    """Fire `requests` requests with `concurrency` in flight and collect latencies."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+    
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    }
+
+
+async def main():
+    """Run every concurrency level and print a summary table."""
+    parser = argparse.ArgumentParser(description="Rovnic API load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/nba?fresh=true")
+    parser.add_argument("--levels", default="1,2,4,8,16,32")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per level")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+    
+    levels = [int(level) for level in args.levels.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        print(f"[LOAD] {args.url}{args.path}, {args.requests} requests per level")
+        print(f"{'conc':>6} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+        baseline = None
+        for level in levels:
+            result = await run_level(client, args.path, level, args.requests)
+            baseline = baseline or result["throughput"]
+            print(
+                f"{result['concurrency']:>6} {result['throughput']:>10.1f} {result['p50_ms']:>10.1f} "
+                f"{result['p99_ms']:>10.1f} {result['errors']:>8}  ({result['throughput'] / baseline:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
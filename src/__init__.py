@@ -2,5 +2,15 @@
 Rovnic Agentic AI - Enterprise sports prediction system.
 """
 
+import os
+import sys
+
 __version__ = "1.0.0"
 __author__ = "Rovnic AI Team"
+
+# Modules import each other as top-level packages (services, agents, utils), the
+# way they resolve under `python src/main.py`. Put src/ on the path so the same
+# imports work when loaded as the src package, e.g. `uvicorn src.api_server:app`.
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
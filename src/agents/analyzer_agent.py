@@ -3,10 +3,13 @@ Analyzer Agent - Uses GPT-4.1-mini to analyze predictions intelligently.
 """
 
 import os
-import openai
-from typing import Dict
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
 import logging
 
+from services.analysis_cache import AnalysisCache
+from services.openai_dispatcher import BATCH, INTERACTIVE, get_dispatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,22 +19,47 @@ class AnalyzerAgent:
     def __init__(self):
         """Initialize analyzer agent."""
         self.api_key = os.getenv("OPENAI_API_KEY")
-        openai.api_key = self.api_key
+        self.dispatcher = get_dispatcher()
         self.model = os.getenv("EXPLANATION_MODEL", "gpt-4.1-mini")
+        self.cache = AnalysisCache() if os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true" else None
+        # Batch mode: prompt-token budget and game cap per completion
+        self.batch_token_budget = int(os.getenv("ANALYSIS_BATCH_TOKEN_BUDGET", 2000))
+        self.batch_max_games = int(os.getenv("ANALYSIS_BATCH_MAX_GAMES", 15))
+        self.tokens_per_analysis = 150
     
-    def analyze(self, game_data: Dict, prediction: Dict, odds: Dict) -> str:
+    def analyze(self, game_data: Dict, prediction: Dict, odds: Dict, priority: int = INTERACTIVE) -> str:
         """Generate AI analysis for a prediction."""
         if not self.api_key:
             logger.warning("OpenAI API key not set")
             return "Analysis unavailable"
         
+        cache_key = self.cache.key(game_data, prediction, odds) if self.cache else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             game = game_data.get('game', 'Game')
-            sport = game_data.get('sport', 'Unknown').upper()
-            pred = prediction.get('prediction', 'TBD')
-            conf = prediction.get('confidence', 0.0)
+            response = self.dispatcher.chat(priority=priority, **self._request(game_data, prediction))
             
-            prompt = f"""
+            analysis = response.choices[0].message.content
+            logger.info(f"Analysis generated for {game}")
+            if cache_key is not None:
+                self.cache.put(cache_key, analysis)
+            return analysis
+        except Exception as e:
+            logger.error(f"Analysis error: {str(e)}")
+            return "Unable to generate analysis"
+    
+    def _request(self, game_data: Dict, prediction: Dict) -> Dict:
+        """Chat completion parameters for a single-game analysis."""
+        game = game_data.get('game', 'Game')
+        sport = game_data.get('sport', 'Unknown').upper()
+        pred = prediction.get('prediction', 'TBD')
+        conf = prediction.get('confidence', 0.0)
+        
+        prompt = f"""
             Analyze this {sport} prediction:
             Game: {game}
             ML Prediction: {pred} (confidence: {conf:.1%})
@@ -40,17 +68,167 @@ class AnalyzerAgent:
             Focus on: team stats, recent performance, and market factors.
             Keep it concise and actionable.
             """
+        
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 150,
+            "temperature": 0.7
+        }
+    
+    def analyze_stream(self, game_data: Dict, prediction: Dict, odds: Dict, priority: int = INTERACTIVE) -> Iterator[str]:
+        """Yield analysis text as it is generated (a cached analysis is yielded whole)."""
+        if not self.api_key:
+            logger.warning("OpenAI API key not set")
+            yield "Analysis unavailable"
+            return
+        
+        cache_key = self.cache.key(game_data, prediction, odds) if self.cache else None
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            for delta in self.dispatcher.stream_chat(priority=priority, **self._request(game_data, prediction)):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Streaming analysis error: {str(e)}")
+            if not parts:
+                yield "Unable to generate analysis"
+            return
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, "".join(parts))
+    
+    async def analyze_stream_async(
+        self,
+        game_data: Dict,
+        prediction: Dict,
+        odds: Dict,
+        priority: int = INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Async variant of analyze_stream for event-loop callers."""
+        if not self.api_key:
+            logger.warning("OpenAI API key not set")
+            yield "Analysis unavailable"
+            return
+        
+        cache_key = self.cache.key(game_data, prediction, odds) if self.cache else None
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            async for delta in self.dispatcher.astream_chat(priority=priority, **self._request(game_data, prediction)):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Streaming analysis error: {str(e)}")
+            if not parts:
+                yield "Unable to generate analysis"
+            return
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, "".join(parts))
+    
+    def analyze_batch(self, items: List[Tuple[Dict, Dict, Dict]], priority: int = BATCH) -> List[str]:
+        """Analyze many (game_data, prediction, odds) items with one completion per chunk.
+        
+        Results come back in input order. Games missing from a batch response
+        (or a whole chunk that fails to parse) fall back to per-game calls.
+        """
+        if not self.api_key:
+            logger.warning("OpenAI API key not set")
+            return ["Analysis unavailable"] * len(items)
+        
+        results: List[str] = [None] * len(items)
+        pending = []
+        for i, (game_data, prediction, odds) in enumerate(items):
+            cache_key = self.cache.key(game_data, prediction, odds) if self.cache else None
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, cache_key))
+        
+        for chunk in self._chunk([(i, self._batch_entry(i, items[i])) for i, _ in pending]):
+            analyses = self._complete_batch([entry for _, entry in chunk], priority)
+            for i, entry in chunk:
+                analysis = analyses.get(entry["id"])
+                if analysis:
+                    results[i] = analysis
+        
+        keys = dict(pending)
+        for i, _ in pending:
+            if results[i] is None:
+                # Not answered by the batch: one game, one prompt
+                results[i] = self.analyze(*items[i], priority=priority)
+            elif keys[i] is not None:
+                self.cache.put(keys[i], results[i])
+        return results
+    
+    @staticmethod
+    def _batch_entry(index: int, item: Tuple[Dict, Dict, Dict]) -> Dict:
+        """Compact per-game payload for a batch prompt."""
+        game_data, prediction, _ = item
+        return {
+            "id": str(game_data.get("event_id") or index),
+            "sport": str(game_data.get("sport", "Unknown")).upper(),
+            "game": game_data.get("game", "Game"),
+            "prediction": prediction.get("prediction", "TBD"),
+            "confidence": round(float(prediction.get("confidence", 0.0)), 3)
+        }
+    
+    def _chunk(self, entries: List[Tuple[int, Dict]]) -> List[List[Tuple[int, Dict]]]:
+        """Split entries so each prompt stays within the token budget and game cap."""
+        chunks, current, tokens = [], [], 0
+        for index, entry in entries:
+            # ~4 characters per token is close enough for budgeting
+            cost = len(json.dumps(entry)) // 4 + 1
+            if current and (tokens + cost > self.batch_token_budget or len(current) >= self.batch_max_games):
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append((index, entry))
+            tokens += cost
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _complete_batch(self, entries: List[Dict], priority: int = BATCH) -> Dict[str, str]:
+        """One structured-output completion for a chunk; returns id -> analysis."""
+        prompt = f"""
+            Analyze each of these sports predictions:
+            {json.dumps(entries)}
             
-            response = openai.chat.completions.create(
+            For every game, provide a 2-3 sentence analysis explaining why the prediction makes sense.
+            Focus on: team stats, recent performance, and market factors.
+            Keep it concise and actionable.
+            Respond with a JSON object: {{"analyses": [{{"id": "<id>", "analysis": "<text>"}}]}}
+            """
+        
+        try:
+            response = self.dispatcher.chat(
+                priority=priority,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=150,
-                temperature=0.7
+                max_tokens=self.tokens_per_analysis * len(entries) + 50,
+                temperature=0.7,
+                response_format={"type": "json_object"}
             )
             
-            analysis = response.choices[0].message.content
-            logger.info(f"Analysis generated for {game}")
-            return analysis
+            payload = json.loads(response.choices[0].message.content)
+            analyses = {
+                str(item.get("id")): item.get("analysis")
+                for item in payload.get("analyses", [])
+                if isinstance(item, dict) and isinstance(item.get("analysis"), str)
+            }
+            logger.info(f"Batch analysis generated for {len(analyses)}/{len(entries)} games")
+            return analyses
         except Exception as e:
-            logger.error(f"Analysis error: {str(e)}")
-            return "Unable to generate analysis"
+            logger.error(f"Batch analysis error, falling back to per-game calls: {str(e)}")
+            return {}
@@ -3,15 +3,16 @@ Model retraining agent for auto-improvement when accuracy drops.
 """
 
 import os
-import joblib
 from datetime import datetime
-from typing import Dict
+from typing import Callable, Dict, Optional
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import logging
 from services.firestore import FirestoreClient
+from services.features import FEATURE_NAMES
+from services.model_registry import ModelRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +23,7 @@ class RetrainAgent:
     def __init__(self):
         """Initialize retrain agent."""
         self.db = FirestoreClient()
-        self.model_path = "models/model.pkl"
-        self.scaler_path = "models/scaler.pkl"
+        self.registry = ModelRegistry("models")
         self.min_predictions = int(os.getenv("RETRAINING_MIN_PREDICTIONS", 10))
     
     def fetch_recent_predictions(self, sport: str, limit: int = 100) -> pd.DataFrame:
@@ -48,8 +48,12 @@ class RetrainAgent:
             if df.empty:
                 return None, None
             
-            # Mock feature engineering
-            features = df[['confidence']].values if 'confidence' in df else np.random.randn(len(df), 1)
+            # Use the odds features stored with each prediction when available
+            if 'features' in df:
+                df = df[df['features'].apply(lambda f: isinstance(f, list) and len(f) == len(FEATURE_NAMES))]
+                features = np.array(df['features'].tolist(), dtype=np.float64)
+            else:
+                features = df[['confidence']].values if 'confidence' in df else np.random.randn(len(df), 1)
             labels = np.array([1 if p == 'Win' else 0 for p in df.get('prediction', [])])
             
             logger.info(f"Prepared {len(features)} training samples")
@@ -58,12 +62,12 @@ class RetrainAgent:
             logger.error(f"Error preparing data: {str(e)}")
             return None, None
     
-    def retrain_model(self, X, y) -> bool:
-        """Retrain the ML model."""
+    def retrain_model(self, X, y, sport: str) -> Optional[str]:
+        """Retrain the sport's ML model and publish it; returns the new version."""
         try:
             if X is None or y is None:
                 logger.error("No training data")
-                return False
+                return None
             
             logger.info("Starting model retraining...")
             
@@ -72,27 +76,32 @@ class RetrainAgent:
             X_scaled = scaler.fit_transform(X)
             
             # Train model
-            model = RandomForestClassifier(n_estimators=100, random_state=42)
+            model = RandomForestClassifier(
+                n_estimators=100,
+                random_state=42,
+                n_jobs=int(os.getenv("RETRAIN_N_JOBS", 1))
+            )
             model.fit(X_scaled, y)
             
-            # Save models
-            joblib.dump(model, self.model_path)
-            joblib.dump(scaler, self.scaler_path)
+            # Publish as a new version; running pipelines hot-swap to it
+            version = self.registry.publish(sport, model, scaler, {
+                "n_samples": len(y),
+                "backend": os.getenv("INFERENCE_BACKEND", "sklearn")
+            })
             
-            logger.info("Model retraining completed")
-            return True
+            logger.info(f"Model retraining completed ({sport} version {version})")
+            return version
         except Exception as e:
             logger.error(f"Error retraining model: {str(e)}")
-            return False
+            return None
     
-    def validate_model(self, X, y) -> float:
+    def validate_model(self, X, y, sport: str, version: str) -> float:
         """Validate retrained model."""
         try:
-            model = joblib.load(self.model_path)
-            scaler = joblib.load(self.scaler_path)
+            bundle = self.registry.load(sport, version)
             
-            X_scaled = scaler.transform(X)
-            accuracy = model.score(X_scaled, y)
+            X_scaled = bundle.scaler.transform(X)
+            accuracy = bundle.model.score(X_scaled, y)
             
             logger.info(f"Model validation accuracy: {accuracy:.2%}")
             return accuracy
@@ -100,9 +109,10 @@ class RetrainAgent:
             logger.error(f"Error validating model: {str(e)}")
             return 0.0
     
-    def trigger_retraining(self, sport: str) -> Dict:
+    def trigger_retraining(self, sport: str, progress: Optional[Callable[[str], None]] = None) -> Dict:
         """Trigger full retraining pipeline."""
         logger.info(f"Triggering retraining for {sport}...")
+        report = progress or (lambda step: None)
         
         result = {
             "sport": sport,
@@ -113,6 +123,7 @@ class RetrainAgent:
         try:
             # Step 1: Fetch predictions
             logger.info("[1/4] Fetching recent predictions...")
+            report("1/4 fetching recent predictions")
             df = self.fetch_recent_predictions(sport)
             
             if len(df) < self.min_predictions:
@@ -123,26 +134,32 @@ class RetrainAgent:
             
             # Step 2: Prepare data
             logger.info("[2/4] Preparing training data...")
+            report("2/4 preparing training data")
             X, y = self.prepare_training_data(df)
             
             # Step 3: Retrain
             logger.info("[3/4] Retraining model...")
-            if not self.retrain_model(X, y):
+            report("3/4 retraining model")
+            version = self.retrain_model(X, y, sport)
+            if version is None:
                 result["status"] = "failed"
                 return result
             
             # Step 4: Validate
             logger.info("[4/4] Validating model...")
-            accuracy = self.validate_model(X, y)
+            report("4/4 validating model")
+            accuracy = self.validate_model(X, y, sport, version)
             
             result["status"] = "completed"
             result["accuracy"] = accuracy
+            result["version"] = version
             
             # Save to Firestore
             self.db.save_meta_feedback({
                 "sport": sport,
                 "retraining_completed": True,
                 "new_accuracy": accuracy,
+                "model_version": version,
                 "timestamp": datetime.utcnow().isoformat()
             })
             
@@ -0,0 +1,193 @@
+"""
+Retraining scheduler - runs sport retrains in a capped process pool off the prediction path.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, wait as wait_futures
+from datetime import datetime
+from threading import Lock, Thread
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ("queued", "running")
+
+
+def _limit_worker_resources(memory_mb: int, nice: int, n_jobs: int):
+    """Process pool initializer: cap memory, CPU priority and thread fan-out."""
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not set retrain memory limit: {str(e)}")
+    
+    try:
+        os.nice(nice)
+    except (AttributeError, OSError) as e:
+        logger.warning(f"Could not lower retrain CPU priority: {str(e)}")
+    
+    # Keep BLAS/OpenMP pools within the per-job CPU budget
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(n_jobs)
+    os.environ["RETRAIN_N_JOBS"] = str(n_jobs)
+
+
+def _run_retrain(sport: str, progress) -> Dict:
+    """Worker entry point: run one sport's retraining pipeline."""
+    from agents.retrain_agent import RetrainAgent
+    
+    def report(step: str):
+        try:
+            progress[sport] = {"step": step, "updated_at": datetime.utcnow().isoformat()}
+        except (EOFError, OSError) as e:
+            # The parent is shutting down; finish the retrain without progress
+            logger.warning(f"Could not report {sport} retrain progress: {str(e)}")
+    
+    report("starting")
+    return RetrainAgent().trigger_retraining(sport, progress=report)
+
+
+class RetrainScheduler:
+    """Queues retrains with one job in flight per sport."""
+    
+    def __init__(self, db=None):
+        """Initialize retrain scheduler."""
+        self.db = db
+        self.max_workers = int(os.getenv("RETRAIN_MAX_WORKERS", 2))
+        self.memory_mb = int(os.getenv("RETRAIN_MEMORY_LIMIT_MB", 4096))
+        self.nice = int(os.getenv("RETRAIN_NICE", 10))
+        self.n_jobs = int(os.getenv("RETRAIN_N_JOBS", 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._jobs: Dict[str, Dict] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = Lock()
+    
+    def _ensure_pool(self):
+        """Start the worker pool and shared progress map on first use."""
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_limit_worker_resources,
+                initargs=(self.memory_mb, self.nice, self.n_jobs)
+            )
+    
+    def submit(self, sport: str) -> Dict:
+        """Queue a retrain for a sport unless one is already queued or running."""
+        with self._lock:
+            job = self._jobs.get(sport)
+            if job is not None and job["status"] in ACTIVE_STATES:
+                logger.info(f"[RETRAIN] {sport} retrain already {job['status']}, not queuing another")
+                return {**self._snapshot(sport), "deduplicated": True}
+            
+            self._ensure_pool()
+            self._progress.pop(sport, None)
+            self._jobs[sport] = {
+                "sport": sport,
+                "status": "queued",
+                "queued_at": datetime.utcnow().isoformat()
+            }
+            future = self._executor.submit(_run_retrain, sport, self._progress)
+            self._futures[sport] = future
+        
+        future.add_done_callback(lambda f: self._on_done(sport, f))
+        self._persist(sport)
+        logger.info(f"[RETRAIN] Queued retrain for {sport}")
+        return self.status(sport)
+    
+    def _on_done(self, sport: str, future: Future):
+        """Record the outcome of a finished retrain."""
+        with self._lock:
+            job = self._jobs[sport]
+            job["finished_at"] = datetime.utcnow().isoformat()
+            if future.cancelled():
+                job["status"] = "cancelled"
+            else:
+                try:
+                    result = future.result()
+                    job["status"] = result.get("status", "completed")
+                    job["result"] = result
+                except Exception as e:
+                    logger.error(f"[RETRAIN] Worker failed for {sport}: {str(e)}")
+                    job["status"] = "failed"
+                    job["error"] = str(e)
+        self._persist(sport)
+        logger.info(f"[RETRAIN] {sport} retrain finished: {job['status']}")
+    
+    def _snapshot(self, sport: str) -> Dict:
+        """Job state merged with live worker progress."""
+        job = dict(self._jobs.get(sport) or {})
+        if job.get("status") not in ACTIVE_STATES or self._progress is None:
+            return job
+        progress = self._progress.get(sport)
+        if progress:
+            job["status"] = "running"
+            job["progress"] = progress
+        return job
+    
+    def status(self, sport: str) -> Dict:
+        """Get the current or last retrain status for a sport."""
+        with self._lock:
+            job = self._snapshot(sport)
+        if job:
+            return job
+        
+        # Retrains launched by another process (e.g. the scheduler) are persisted
+        if self.db is not None:
+            stored = self.db.get_retrain_status(sport)
+            if stored:
+                return stored
+        return {"sport": sport, "status": "idle"}
+    
+    def _persist(self, sport: str):
+        """Store job status so other processes can query it."""
+        if self.db is not None:
+            with self._lock:
+                job = self._snapshot(sport)
+            self.db.save_retrain_status(sport, job)
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool.
+        
+        Without wait, queued retrains are cancelled and running ones are
+        recorded as interrupted until they report back. The progress manager
+        stays up until the running workers exit, so they never write into a
+        closed pipe.
+        """
+        if self._executor is None:
+            return
+        executor, manager = self._executor, self._manager
+        self._executor = None
+        running = []
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+            if not wait:
+                running = [s for s, job in self._jobs.items() if job["status"] in ACTIVE_STATES]
+                for sport in running:
+                    self._jobs[sport]["status"] = "interrupted"
+                    self._jobs[sport]["interrupted_at"] = datetime.utcnow().isoformat()
+        for sport in running:
+            self._persist(sport)
+        
+        executor.shutdown(wait=wait, cancel_futures=not wait)
+        if wait:
+            self._stop_manager(futures, manager)
+        else:
+            Thread(target=self._stop_manager, args=(futures, manager), name="retrain-shutdown").start()
+    
+    def _stop_manager(self, futures: List[Future], manager):
+        """Shut the progress manager down once every submitted retrain has finished."""
+        wait_futures(futures)
+        with self._lock:
+            if self._manager is manager:
+                self._progress = None
+        manager.shutdown()
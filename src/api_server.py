@@ -3,15 +3,22 @@ FastAPI REST API server for Rovnic Agentic AI.
 Exposes endpoints for all 8 supported sports.
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+from collections import OrderedDict
 from datetime import datetime
 import os
+import json
+import asyncio
+import threading
 import logging
 from dotenv import load_dotenv
 
+from utils.concurrency import run_blocking, shutdown_executors
+
 # Setup
 load_dotenv()
 
@@ -43,14 +50,15 @@ except Exception as e:
     logger.warning(f"Could not load setup_logging: {e}")
 
 try:
-    from services.odds_api import OddsAPIClient
-    odds_client = OddsAPIClient()
+    from services.odds_api import AsyncOddsAPIClient
+    odds_client = AsyncOddsAPIClient()
 except Exception as e:
-    logger.warning(f"Could not load OddsAPIClient: {e}")
+    logger.warning(f"Could not load AsyncOddsAPIClient: {e}")
     odds_client = None
 
 try:
     from services.ml_pipeline import MLPipeline
+    from services.features import extract_features
     ml_pipeline = MLPipeline()
 except Exception as e:
     logger.warning(f"Could not load MLPipeline: {e}")
@@ -85,13 +93,84 @@ except Exception as e:
     analyzer = None
 
 try:
-    from agents.retrain_agent import RetrainAgent
-    retrain_agent = RetrainAgent()
+    from agents.retrain_scheduler import RetrainScheduler
+    retrain_scheduler = RetrainScheduler(db)
+except Exception as e:
+    logger.warning(f"Could not load RetrainScheduler: {e}")
+    retrain_scheduler = None
+
+try:
+    from services.settlement import SettlementEngine
+    settlement = SettlementEngine(db)
 except Exception as e:
-    logger.warning(f"Could not load RetrainAgent: {e}")
-    retrain_agent = None
+    logger.warning(f"Could not load SettlementEngine: {e}")
+    settlement = None
+
+from services.stream_hub import StreamHub
+from services.odds_diff import OddsSnapshotStore
+from services.prediction_store import PredictionSnapshot, PredictionStore
+hub = StreamHub()
+odds_store = OddsSnapshotStore()
+prediction_store = PredictionStore()
+refresh_locks: Dict[str, asyncio.Lock] = {}
+prediction_watch = None
+refresh_task = None
+stream_tasks: set = set()
+# Stream events already published, so local publishes and the Firestore watch never double up
+relayed: "OrderedDict[tuple, None]" = OrderedDict()
+relayed_lock = threading.Lock()
+RELAYED_MAX = 10000
+
+
+def _relay(sport: str, event_type: str, key: tuple, data: Dict):
+    """Publish a stream event once per key, from any thread."""
+    with relayed_lock:
+        if key in relayed:
+            return
+        relayed[key] = None
+        while len(relayed) > RELAYED_MAX:
+            relayed.popitem(last=False)
+    hub.publish_threadsafe(sport, event_type, data)
+
+
+def _relay_index_change(entry: Dict):
+    """Turn a prediction index change (from any process) into stream events."""
+    sport = str(entry.get("sport", "")).lower()
+    event_id = entry.get("event_id")
+    if entry.get("settled"):
+        _relay(sport, "outcome", ("outcome", event_id), entry)
+        return
+    _relay(sport, "prediction", ("prediction", event_id, entry.get("timestamp")), entry)
+    if entry.get("audio_url"):
+        _relay(sport, "audio", ("audio", event_id, entry["audio_url"]), {"event_id": event_id, "audio_url": entry["audio_url"]})
+
+
+def _on_voice_ready(job, url: str):
+    """Tell stream subscribers when a prediction's audio is attached."""
+    _relay(job.sport, "audio", ("audio", job.event_id, url), {"event_id": job.event_id, "audio_url": url})
+
+
+try:
+    from services.tts_engine import TTSEngine
+    from services.tts_queue import TTSQueue, summary_text
+    tts_engine = TTSEngine()
+    tts_queue = TTSQueue(tts_engine, db, on_complete=_on_voice_ready) if db is not None else None
+except Exception as e:
+    logger.warning(f"Could not load TTS queue: {e}")
+    tts_engine = None
+    tts_queue = None
+
+SPORTS = ["nba", "nfl", "mlb", "nhl", "ncaaf", "ncaab", "soccer", "ufc"]
 
 # Models
+class GamePrediction(BaseModel):
+    event_id: Optional[str]
+    game: str
+    commence_time: Optional[str]
+    prediction: str
+    confidence: float
+
+
 class PredictionResponse(BaseModel):
     sport: str
     game: str
@@ -101,6 +180,8 @@ class PredictionResponse(BaseModel):
     audio_url: Optional[str]
     timestamp: str
     firestore_path: str
+    snapshot: Optional[Dict] = None
+    games: List[GamePrediction] = []
 
 
 class HealthResponse(BaseModel):
@@ -112,6 +193,15 @@ class MetricsResponse(BaseModel):
     predictions_total: int
     avg_confidence: float
     errors: int
+    odds_cache: Dict[str, float] = {}
+    odds_quota: Dict = {}
+    firestore_writes: Dict[str, int] = {}
+    firestore_query_cache: Dict[str, float] = {}
+    streams: Dict[str, int] = {}
+    prediction_store: Dict = {}
+    analysis_cache: Dict[str, float] = {}
+    openai_dispatcher: Dict = {}
+    tts_queue: Dict = {}
 
 
 # Global stats
@@ -142,7 +232,16 @@ async def get_metrics():
     return {
         "predictions_total": stats.predictions_total,
         "avg_confidence": stats.avg_confidence,
-        "errors": stats.errors
+        "errors": stats.errors,
+        "odds_cache": odds_client.cache.get_stats() if odds_client and odds_client.cache else {},
+        "odds_quota": odds_client.quota.get_stats() if odds_client else {},
+        "firestore_writes": db.writer.get_stats() if db and db.writer else {},
+        "firestore_query_cache": db.cache.get_stats() if db else {},
+        "streams": hub.get_stats(),
+        "prediction_store": prediction_store.get_stats(),
+        "analysis_cache": analyzer.cache.get_stats() if analyzer and analyzer.cache else {},
+        "openai_dispatcher": analyzer.dispatcher.get_stats() if analyzer else {},
+        "tts_queue": tts_queue.get_stats() if tts_queue else {}
     }
 
 
@@ -160,9 +259,10 @@ async def root():
 
 
 @app.get("/predict")
-async def predict():
-    """Simple prediction endpoint."""
+async def predict(sport: str = "nba"):
+    """Simple prediction endpoint: the next game on a sport's slate."""
     logger.info("[PREDICT] Simple prediction endpoint called")
+    sport = _stream_sport(sport)
     try:
         if ml_pipeline is None:
             return {
@@ -171,11 +271,18 @@ async def predict():
                 "status": "using_default_model"
             }
         
-        # Generate prediction using ML pipeline
-        features = [0.5, 1.2]  # Mock features
-        result = ml_pipeline.predict(features)
+        # Same feature layout the models were trained on
+        odds_data = await odds_client.get_odds(sport) if odds_client else []
+        if not odds_data:
+            raise HTTPException(status_code=404, detail=f"No games available for {sport}")
+        event = odds_data[0]
+        features = await run_blocking("model", extract_features, [event])
+        result = await run_blocking("model", ml_pipeline.predict, features[0].tolist(), sport)
+        result = {**result, "event_id": event.get("id"), "game": f"{event.get('home_team', 'Home')} vs {event.get('away_team', 'Away')}"}
         logger.info(f"[PREDICT] Prediction generated: {result}")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[PREDICT] Error: {str(e)}")
         return {
@@ -197,7 +304,7 @@ async def odds():
             }
         
         # Fetch odds for NBA as default
-        odds_data = odds_client.get_odds("nba")
+        odds_data = await odds_client.get_odds("nba")
         logger.info(f"[ODDS] Fetched odds data")
         return {
             "odds": odds_data,
@@ -213,68 +320,133 @@ async def odds():
 
 
 # Sport prediction endpoints
-async def predict_sport(sport: str, background_tasks: BackgroundTasks) -> PredictionResponse:
-    """Generic sport prediction handler."""
-    logger.info(f"[API] Prediction request for {sport.upper()}")
+async def prepare_prediction(sport: str, skip_unchanged: bool = False) -> Optional[Tuple[Dict, Dict, Dict]]:
+    """Fetch odds and run inference; returns (result without analysis, headline event, prediction).
+    
+    With skip_unchanged, returns None when no line has moved since the last
+    computation, so nothing is re-predicted, rewritten or republished.
+    """
+    # 1. Fetch odds
+    logger.info(f"[FETCH] Fetching live odds for {sport}...")
+    odds_data = await odds_client.get_odds(sport)
+    
+    if not odds_data:
+        stats.errors += 1
+        logger.warning(f"No odds data for {sport}")
+        raise HTTPException(
+            status_code=404,
+            detail=f"No games available for {sport}"
+        )
+    
+    changes = odds_store.diff(sport, odds_data)
+    moved = bool(changes["new"] or changes["changed"] or changes["removed"])
+    if skip_unchanged and not moved:
+        logger.info(f"[SKIP] No line movement for {sport}, snapshot unchanged")
+        return None
+    
+    # 2. ML prediction for the whole slate in one batch
+    logger.info(f"[PREDICT] Running ML for {sport}...")
+    features = await run_blocking("model", extract_features, odds_data)
+    predictions = await run_blocking("model", ml_pipeline.predict_batch, features, sport)
+    
+    if "error" in predictions:
+        stats.errors += 1
+        raise HTTPException(status_code=500, detail="Prediction failed")
+    
+    # Push line movements to stream subscribers
+    if moved:
+        hub.publish(sport, "odds", {k: changes[k] for k in ("new", "changed", "removed", "unchanged")})
+    odds_store.commit(sport, odds_data)
+    
+    games = [
+        {
+            "event_id": e.get("id"),
+            "game": f"{e.get('home_team', 'Home')} vs {e.get('away_team', 'Away')}",
+            "commence_time": e.get("commence_time"),
+            "prediction": p,
+            "confidence": c
+        }
+        for e, p, c in zip(odds_data, predictions["prediction"].tolist(), predictions["confidence"].tolist())
+    ]
+    
+    # Headline game is the next one on the slate
+    event = odds_data[0]
+    game = games[0]["game"]
+    prediction = ml_pipeline.prediction_at(predictions, 0)
+    
+    today = datetime.utcnow().date().isoformat()
+    game_id = game.replace(" ", "_")
+    firestore_path = f"predictions/{sport}/{today}/{game_id}"
+    
+    result = {
+        "sport": sport.upper(),
+        "event_id": event.get("id"),
+        "game": game,
+        "home_team": event.get("home_team"),
+        "away_team": event.get("away_team"),
+        "commence_time": event.get("commence_time"),
+        "prediction": prediction.get("prediction"),
+        "confidence": prediction.get("confidence"),
+        "features": features[0].tolist(),
+        "analysis": None,
+        "audio_url": None,
+        "timestamp": datetime.utcnow().isoformat(),
+        "firestore_path": firestore_path,
+        "games": games
+    }
+    return result, event, prediction
+
+
+async def finalize_prediction(sport: str, result: Dict, analysis: str) -> Dict:
+    """Attach analysis and voice, persist, publish and record stats."""
+    # 4. Voice: stored audio is attached now, otherwise a TTS worker patches it in later
+    summary = summary_text(result, analysis) if tts_queue is not None else None
+    audio_url = tts_engine.lookup(summary) if summary else None
+    result = {**result, "analysis": analysis, "audio_url": audio_url}
+    
+    # 5. Save to Firestore (queued for a batched commit)
+    saved = await run_blocking("firestore", db.save_prediction, sport, result, buffered=True)
+    if saved and summary and audio_url is None:
+        tts_queue.enqueue(sport, summary, result["firestore_path"], result["event_id"])
+    
+    # Publish right away; the Firestore watch skips events already relayed
+    _relay(
+        sport,
+        "prediction",
+        ("prediction", result["event_id"], result["timestamp"]),
+        {k: v for k, v in result.items() if k != "features"}
+    )
+    
+    # Update stats
+    stats.predictions_total += 1
+    stats.avg_confidence = (
+        (stats.avg_confidence * (stats.predictions_total - 1) + result["confidence"]) 
+        / stats.predictions_total
+    )
+    
+    logger.info(f"[SUCCESS] {sport.upper()} prediction computed")
+    return result
+
+
+async def compute_prediction(sport: str, skip_unchanged: bool = False) -> Optional[Dict]:
+    """Run the full fetch, predict, analyze and persist pipeline for a sport.
+    
+    Returns None if skip_unchanged is set and the odds have not moved.
+    """
+    logger.info(f"[PIPELINE] Computing predictions for {sport.upper()}")
     
     try:
-        # 1. Fetch odds
-        logger.info(f"[FETCH] Fetching live odds for {sport}...")
-        odds_data = odds_client.get_odds(sport)
-        
-        if not odds_data:
-            stats.errors += 1
-            logger.warning(f"No odds data for {sport}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"No games available for {sport}"
-            )
-        
-        # 2. ML prediction
-        logger.info(f"[PREDICT] Running ML for {sport}...")
-        features = [0.5, 1.2]  # Mock - extract from odds_data in production
-        prediction = ml_pipeline.predict(features)
-        
-        if "error" in prediction:
-            stats.errors += 1
-            raise HTTPException(status_code=500, detail="Prediction failed")
+        prepared = await prepare_prediction(sport, skip_unchanged)
+        if prepared is None:
+            return None
+        result, event, prediction = prepared
         
         # 3. AI analysis
         logger.info(f"[ANALYZE] AI analysis for {sport}...")
-        game_data = {"game": "Team A vs Team B", "sport": sport}
-        analysis = analyzer.analyze(game_data, prediction, odds_data)
-        
-        # 4. Generate voice (mock - would integrate TTS here)
-        audio_url = None
-        
-        # 5. Build response
-        today = datetime.utcnow().date().isoformat()
-        game_id = "game_1"
-        firestore_path = f"predictions/{sport.upper()}/{today}/{game_id}"
-        
-        result = {
-            "sport": sport.upper(),
-            "game": "Team A vs Team B",
-            "prediction": prediction.get("prediction"),
-            "confidence": prediction.get("confidence"),
-            "analysis": analysis,
-            "audio_url": audio_url,
-            "timestamp": datetime.utcnow().isoformat(),
-            "firestore_path": firestore_path
-        }
-        
-        # 6. Save to Firestore (background)
-        background_tasks.add_task(db.save_prediction, sport, result)
+        game_data = {"game": result["game"], "sport": sport, "event_id": result["event_id"]}
+        analysis = await run_blocking("openai", analyzer.analyze, game_data, prediction, event)
         
-        # Update stats
-        stats.predictions_total += 1
-        stats.avg_confidence = (
-            (stats.avg_confidence * (stats.predictions_total - 1) + prediction.get("confidence")) 
-            / stats.predictions_total
-        )
-        
-        logger.info(f"[SUCCESS] {sport.upper()} prediction returned")
-        return result
+        return await finalize_prediction(sport, result, analysis)
         
     except HTTPException:
         raise
@@ -284,53 +456,227 @@ async def predict_sport(sport: str, background_tasks: BackgroundTasks) -> Predic
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def refresh_sport(sport: str, seen_version: int = 0, skip_unchanged: bool = False) -> PredictionSnapshot:
+    """Recompute a sport's snapshot, coalescing concurrent refreshes.
+    
+    With skip_unchanged, an existing snapshot is kept (and marked checked)
+    when no line has moved.
+    """
+    async with refresh_locks.setdefault(sport, asyncio.Lock()):
+        # Someone else refreshed while we waited for the lock
+        current = prediction_store.peek(sport)
+        if current is not None and current.version > seen_version:
+            return current
+        result = await compute_prediction(sport, skip_unchanged and current is not None)
+        if result is None:
+            prediction_store.mark_checked(sport)
+            return current
+        return prediction_store.put(sport, result)
+
+
+async def refresh_loop():
+    """Background refresher keeping every sport's snapshot warm."""
+    interval = float(os.getenv("PREDICTION_REFRESH_SECONDS", 300))
+    while True:
+        for sport in SPORTS:
+            current = prediction_store.peek(sport)
+            try:
+                await refresh_sport(sport, current.version if current else 0, skip_unchanged=True)
+            except HTTPException as e:
+                logger.info(f"[REFRESH] {sport.upper()} not refreshed: {e.detail}")
+            except Exception as e:
+                logger.error(f"[REFRESH] {sport.upper()} refresh failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def predict_sport(sport: str, fresh: bool = False) -> Dict:
+    """Serve a sport's latest precomputed snapshot; fresh=True recomputes first."""
+    logger.info(f"[API] Prediction request for {sport.upper()}")
+    
+    snapshot = prediction_store.get(sport)
+    if snapshot is None or fresh:
+        # Cold start or explicit escape hatch: compute inline
+        snapshot = await refresh_sport(sport, snapshot.version if snapshot else 0)
+    
+    return {**snapshot.data, "snapshot": prediction_store.metadata(snapshot)}
+
+
 # API Endpoints for 8 Sports
 @app.get("/api/nba", response_model=PredictionResponse)
-async def get_nba(background_tasks: BackgroundTasks):
+async def get_nba(fresh: bool = False):
     """NBA predictions."""
-    return await predict_sport("nba", background_tasks)
+    return await predict_sport("nba", fresh)
 
 
 @app.get("/api/nfl", response_model=PredictionResponse)
-async def get_nfl(background_tasks: BackgroundTasks):
+async def get_nfl(fresh: bool = False):
     """NFL predictions."""
-    return await predict_sport("nfl", background_tasks)
+    return await predict_sport("nfl", fresh)
 
 
 @app.get("/api/mlb", response_model=PredictionResponse)
-async def get_mlb(background_tasks: BackgroundTasks):
+async def get_mlb(fresh: bool = False):
     """MLB predictions."""
-    return await predict_sport("mlb", background_tasks)
+    return await predict_sport("mlb", fresh)
 
 
 @app.get("/api/nhl", response_model=PredictionResponse)
-async def get_nhl(background_tasks: BackgroundTasks):
+async def get_nhl(fresh: bool = False):
     """NHL predictions."""
-    return await predict_sport("nhl", background_tasks)
+    return await predict_sport("nhl", fresh)
 
 
 @app.get("/api/ncaaf", response_model=PredictionResponse)
-async def get_ncaaf(background_tasks: BackgroundTasks):
+async def get_ncaaf(fresh: bool = False):
     """NCAAF predictions."""
-    return await predict_sport("ncaaf", background_tasks)
+    return await predict_sport("ncaaf", fresh)
 
 
 @app.get("/api/ncaab", response_model=PredictionResponse)
-async def get_ncaab(background_tasks: BackgroundTasks):
+async def get_ncaab(fresh: bool = False):
     """NCAAB predictions."""
-    return await predict_sport("ncaab", background_tasks)
+    return await predict_sport("ncaab", fresh)
 
 
 @app.get("/api/soccer", response_model=PredictionResponse)
-async def get_soccer(background_tasks: BackgroundTasks):
+async def get_soccer(fresh: bool = False):
     """Soccer predictions."""
-    return await predict_sport("soccer", background_tasks)
+    return await predict_sport("soccer", fresh)
 
 
 @app.get("/api/ufc", response_model=PredictionResponse)
-async def get_ufc(background_tasks: BackgroundTasks):
+async def get_ufc(fresh: bool = False):
     """UFC predictions."""
-    return await predict_sport("ufc", background_tasks)
+    return await predict_sport("ufc", fresh)
+
+
+# Streaming endpoints
+def _sse(event_type: str, data, event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Events message."""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_sport(sport: str) -> str:
+    """Validate a sport for the streaming, /predict and admin endpoints."""
+    sport = sport.lower()
+    if sport not in SPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown sport: {sport}")
+    return sport
+
+
+@app.get("/stream/{sport}")
+async def stream_sport(sport: str, request: Request):
+    """Server-Sent Events feed of predictions and odds movements for a sport."""
+    sport = _stream_sport(sport)
+    subscription = hub.subscribe(sport)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers")
+    
+    async def events():
+        try:
+            async for message in hub.listen(subscription):
+                if await request.is_disconnected():
+                    break
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(message["type"], message, message["id"])
+        finally:
+            hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/{sport}/stream")
+async def stream_prediction(sport: str):
+    """Fresh prediction as SSE: prediction and odds first, then analysis tokens as they arrive."""
+    sport = _stream_sport(sport)
+    logger.info(f"[API] Streaming prediction request for {sport.upper()}")
+    try:
+        result, event, prediction = await prepare_prediction(sport)
+    except HTTPException:
+        raise
+    except Exception as e:
+        stats.errors += 1
+        logger.error(f"[ERROR] {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    messages: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        # Runs independently of the client so the analysis is persisted even if it disconnects
+        parts = []
+        try:
+            game_data = {"game": result["game"], "sport": sport, "event_id": result["event_id"]}
+            async for delta in analyzer.analyze_stream_async(game_data, prediction, event):
+                parts.append(delta)
+                messages.put_nowait(("analysis", {"delta": delta}))
+            final = await finalize_prediction(sport, result, "".join(parts))
+            snapshot = prediction_store.put(sport, final)
+            messages.put_nowait(("done", {
+                "analysis": final["analysis"],
+                "firestore_path": final["firestore_path"],
+                "snapshot": prediction_store.metadata(snapshot)
+            }))
+        except Exception as e:
+            stats.errors += 1
+            logger.error(f"[ERROR] Streaming analysis failed for {sport}: {str(e)}")
+            messages.put_nowait(("error", {"detail": str(e)}))
+    
+    task = asyncio.create_task(produce())
+    stream_tasks.add(task)
+    task.add_done_callback(stream_tasks.discard)
+    
+    async def events():
+        headline = {k: v for k, v in result.items() if k not in ("features", "analysis", "audio_url")}
+        yield _sse("prediction", {**headline, "odds": event.get("bookmakers", [])})
+        while True:
+            event_type, data = await messages.get()
+            yield _sse(event_type, data)
+            if event_type in ("done", "error"):
+                break
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/{sport}")
+async def websocket_sport(websocket: WebSocket, sport: str):
+    """WebSocket feed of predictions and odds movements for a sport."""
+    sport = sport.lower()
+    if sport not in SPORTS:
+        await websocket.close(code=1008)
+        return
+    
+    subscription = hub.subscribe(sport)
+    if subscription is None:
+        await websocket.close(code=1013)
+        return
+    
+    await websocket.accept()
+    
+    async def pump():
+        async for message in hub.listen(subscription):
+            await websocket.send_text(json.dumps(message or {"type": "heartbeat"}, default=str))
+    
+    sender = asyncio.create_task(pump())
+    try:
+        # Reading notices client disconnects immediately rather than on the next send
+        while not sender.done():
+            await websocket.receive_text()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        sender.cancel()
+        hub.unsubscribe(subscription)
 
 
 # Admin endpoints
@@ -338,22 +684,63 @@ async def get_ufc(background_tasks: BackgroundTasks):
 async def get_accuracy_summary():
     """Get accuracy summary for all sports."""
     logger.info("[ADMIN] Accuracy summary requested")
-    return monitor.get_performance_summary()
+    return await run_blocking("firestore", monitor.get_performance_summary)
 
 
 @app.post("/admin/retrain/{sport}")
 async def trigger_retrain(sport: str):
-    """Manually trigger retraining for a sport."""
+    """Manually queue retraining for a sport."""
     logger.info(f"[ADMIN] Retraining triggered for {sport}")
-    result = retrain_agent.trigger_retraining(sport)
-    return result
+    return await run_blocking("firestore", retrain_scheduler.submit, sport)
+
+
+@app.get("/admin/retrain/{sport}")
+async def get_retrain_status(sport: str):
+    """Get retraining progress and status for a sport."""
+    logger.info(f"[ADMIN] Retraining status requested for {sport}")
+    return await run_blocking("firestore", retrain_scheduler.status, sport)
+
+
+@app.post("/admin/settle")
+async def settle_predictions(sport: Optional[str] = None):
+    """Grade stored predictions against completed scores."""
+    sports = [_stream_sport(sport)] if sport else SPORTS
+    if settlement is None or db is None:
+        raise HTTPException(status_code=503, detail="Settlement unavailable")
+    
+    logger.info(f"[ADMIN] Settlement triggered for {', '.join(sports)}")
+    
+    scores = None
+    if settlement.scores_client is None:
+        if odds_client is None:
+            raise HTTPException(status_code=503, detail="Odds client unavailable")
+        scores = await odds_client.get_all_scores(sports, settlement.days_from)
+    
+    return await run_blocking("firestore", settlement.settle_all, sports, scores)
+
+
+@app.get("/admin/tts/dead-letters")
+async def get_tts_dead_letters():
+    """List voice summaries that exhausted their retries."""
+    if tts_queue is None:
+        raise HTTPException(status_code=503, detail="TTS queue unavailable")
+    return {"dead_letters": tts_queue.dead_letters()}
+
+
+@app.post("/admin/tts/retry")
+async def retry_tts_dead_letters():
+    """Requeue every dead-lettered voice summary."""
+    if tts_queue is None:
+        raise HTTPException(status_code=503, detail="TTS queue unavailable")
+    logger.info("[ADMIN] Retrying dead-lettered voice summaries")
+    return {"requeued": tts_queue.retry_dead_letters()}
 
 
 @app.get("/admin/meta-feedback")
 async def get_meta_feedback(days: int = 7):
     """Get meta-learning feedback history."""
     logger.info("[ADMIN] Meta-feedback requested")
-    return db.get_meta_feedback(days)
+    return await run_blocking("firestore", db.get_meta_feedback, days)
 
 
 # Startup event
@@ -366,12 +753,38 @@ async def startup_event():
     logger.info(f"[CONFIG] Accuracy Threshold: {os.getenv('ACCURACY_THRESHOLD', 0.80)}")
     logger.info(f"[CONFIG] Port: {os.getenv('PORT', 8000)}")
     logger.info("=" * 60 + "\n")
+    
+    # Relay predictions written by any process (e.g. the scheduler) to stream subscribers
+    global prediction_watch, refresh_task
+    hub.bind(asyncio.get_running_loop())
+    if db is not None and os.getenv("STREAM_WATCH_FIRESTORE", "true").lower() == "true":
+        prediction_watch = db.watch_predictions(_relay_index_change)
+    
+    # Precompute snapshots so /api/{sport} reads never wait on the pipeline
+    if os.getenv("PREDICTION_REFRESH_ENABLED", "true").lower() == "true":
+        refresh_task = asyncio.create_task(refresh_loop())
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("[SHUTDOWN] API Server shutting down")
+    if refresh_task is not None:
+        refresh_task.cancel()
+    if prediction_watch is not None:
+        prediction_watch.unsubscribe()
+    if odds_client is not None:
+        await odds_client.aclose()
+    if retrain_scheduler is not None:
+        retrain_scheduler.shutdown(wait=False)
+    # Blocking drains run on their own pool so the loop stays responsive
+    if tts_queue is not None:
+        await run_blocking("shutdown", tts_queue.close, 30)
+    if db is not None:
+        await run_blocking("shutdown", db.close, 30)
+    if analyzer is not None:
+        await run_blocking("shutdown", analyzer.dispatcher.close)
+    shutdown_executors()
 
 
 if __name__ == "__main__":
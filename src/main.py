@@ -5,19 +5,26 @@ Main orchestrator for Rovnic Agentic AI 4-hour prediction cycle.
 import os
 import schedule
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List
 import logging
 from dotenv import load_dotenv
 
 from utils.logger import setup_logging
+from utils.concurrency import upstream_slot
 from services.odds_api import OddsAPIClient
+from services.odds_diff import OddsSnapshotStore
 from services.ml_pipeline import MLPipeline
+from services.features import extract_features
 from services.firestore import FirestoreClient
 from services.s3_upload import S3Manager
 from services.monitor import AccuracyMonitor
+from services.settlement import SettlementEngine
+from services.tts_engine import TTSEngine
+from services.tts_queue import TTSQueue, summary_text
 from agents.analyzer_agent import AnalyzerAgent
-from agents.retrain_agent import RetrainAgent
+from agents.retrain_scheduler import RetrainScheduler
 
 # Setup logging
 logger = setup_logging("rovnic_main")
@@ -25,18 +32,40 @@ logger = setup_logging("rovnic_main")
 # Load environment
 load_dotenv()
 
-# Initialize services
-odds_client = OddsAPIClient()
-ml_pipeline = MLPipeline()
-analyzer = AnalyzerAgent()
-s3_manager = S3Manager()
-db = FirestoreClient()
-monitor = AccuracyMonitor()
-retrain_agent = RetrainAgent()
-
 # All supported sports
 SPORTS = ["nba", "nfl", "mlb", "nhl", "ncaaf", "ncaab", "soccer", "ufc"]
 
+# Services are created by init_services(), not at import: spawned retrain
+# workers re-import this module as __mp_main__ and must not start them again
+odds_client = None
+odds_store = None
+ml_pipeline = None
+analyzer = None
+s3_manager = None
+db = None
+monitor = None
+retrain_scheduler = None
+tts_engine = None
+tts_queue = None
+settlement = None
+
+
+def init_services():
+    """Create the clients, queues and background threads used by the prediction cycle."""
+    global odds_client, odds_store, ml_pipeline, analyzer, s3_manager, db
+    global monitor, retrain_scheduler, tts_engine, tts_queue, settlement
+    odds_client = OddsAPIClient()
+    odds_store = OddsSnapshotStore()
+    ml_pipeline = MLPipeline()
+    analyzer = AnalyzerAgent()
+    s3_manager = S3Manager()
+    db = FirestoreClient()
+    monitor = AccuracyMonitor()
+    retrain_scheduler = RetrainScheduler(db)
+    tts_engine = TTSEngine()
+    tts_queue = TTSQueue(tts_engine, db)
+    settlement = SettlementEngine(db, odds_client)
+
 
 def process_sport(sport: str) -> bool:
     """Process predictions for a single sport."""
@@ -45,39 +74,75 @@ def process_sport(sport: str) -> bool:
     try:
         # 1. Fetch live odds
         logger.info(f"[FETCH] Getting live odds for {sport}...")
-        odds_data = odds_client.get_odds(sport)
+        with upstream_slot("odds_api"):
+            odds_data = odds_client.get_odds(sport)
         if not odds_data:
             logger.warning(f"No odds data for {sport}")
             return False
         
-        # 2. Run ML prediction
-        logger.info(f"[PREDICT] Running ML predictions for {sport}...")
-        features = [0.5, 1.2]  # Mock - extract from odds_data in production
-        prediction = ml_pipeline.predict(features)
+        # 2. Diff against last processed lines; only moved games go downstream
+        changes = odds_store.diff(sport, odds_data)
+        events = changes["events"]
+        logger.info(
+            f"[DIFF] {sport.upper()}: {len(changes['new'])} new, {len(changes['changed'])} moved, "
+            f"{changes['unchanged']} unchanged, {len(changes['removed'])} removed"
+        )
+        if not events:
+            logger.info(f"[SKIP] No line movement for {sport}, nothing to update")
+            return True
+        
+        # 3. Featurize and predict all changed games in one vectorized pass
+        logger.info(f"[PREDICT] Running ML predictions for {len(events)} {sport} games...")
+        features = extract_features(events)
+        predictions = ml_pipeline.predict_batch(features, sport)
+        if "error" in predictions:
+            logger.error(f"[ERROR] Batch prediction failed for {sport}: {predictions['error']}")
+            return False
         
-        # 3. AI analysis
-        logger.info(f"[ANALYZE] Generating AI analysis for {sport}...")
-        game_data = {"game": "Team A vs Team B", "sport": sport}
-        analysis = analyzer.analyze(game_data, prediction, odds_data)
+        # 4. AI analysis for the whole slate, packed into as few completions as possible
+        items = []
+        for i, event in enumerate(events):
+            game = f"{event.get('home_team', 'Home')} vs {event.get('away_team', 'Away')}"
+            game_data = {"game": game, "sport": sport, "event_id": event.get("id")}
+            items.append((game_data, ml_pipeline.prediction_at(predictions, i), event))
         
-        # 4. Generate voice
-        logger.info(f"[VOICE] Generating voice summary for {sport}...")
-        summary_text = f"Prediction: {prediction.get('prediction')} with {prediction.get('confidence'):.1%} confidence. {analysis}"
-        audio_url = None  # Mock TTS
+        logger.info(f"[ANALYZE] Generating AI analysis for {len(items)} {sport} games...")
+        with upstream_slot("openai"):
+            analyses = analyzer.analyze_batch(items)
         
-        # 5. Save to Firestore
-        logger.info(f"[SAVE] Saving to Firestore for {sport}...")
-        result = {
-            "sport": sport.upper(),
-            "game": "Team A vs Team B",
-            "prediction": prediction.get("prediction"),
-            "confidence": prediction.get("confidence"),
-            "analysis": analysis,
-            "audio_url": audio_url,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        for i, event in enumerate(events):
+            game_data, prediction, _ = items[i]
+            game = game_data["game"]
+            analysis = analyses[i]
+            
+            # 5. Voice: reuse stored audio if we have it, otherwise a TTS worker attaches it later
+            summary = summary_text(prediction, analysis)
+            audio_url = tts_engine.lookup(summary)
+            
+            # 6. Save to Firestore
+            logger.info(f"[SAVE] Saving to Firestore for {game}...")
+            result = {
+                "sport": sport.upper(),
+                "event_id": event.get("id"),
+                "game": game,
+                "home_team": event.get("home_team"),
+                "away_team": event.get("away_team"),
+                "commence_time": event.get("commence_time"),
+                "prediction": prediction.get("prediction"),
+                "confidence": prediction.get("confidence"),
+                "features": features[i].tolist(),
+                "analysis": analysis,
+                "audio_url": audio_url,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+            # Queued for a batched commit by the Firestore writer
+            if db.save_prediction(sport, result, buffered=True):
+                odds_store.commit(sport, [event])
+                if audio_url is None:
+                    logger.info(f"[VOICE] Queuing voice summary for {game}...")
+                    tts_queue.enqueue(sport, summary, db.prediction_path(sport, result), event.get("id"))
         
-        db.save_prediction(sport, result)
         logger.info(f"[SUCCESS] {sport.upper()} predictions saved")
         return True
         
@@ -98,13 +163,32 @@ def run_prediction_cycle():
         "summary": {}
     }
     
-    # Process each sport
+    # Process all sports in parallel; each upstream is capped by upstream_slot
     successful = 0
-    for sport in SPORTS:
-        success = process_sport(sport)
-        results["sports"][sport] = {"success": success}
-        if success:
-            successful += 1
+    max_workers = int(os.getenv("CYCLE_MAX_WORKERS", len(SPORTS)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sport") as executor:
+        futures = {executor.submit(process_sport, sport): sport for sport in SPORTS}
+        for future in as_completed(futures):
+            sport = futures[future]
+            try:
+                success = future.result()
+            except Exception as e:
+                logger.error(f"[ERROR] Unhandled failure for {sport}: {str(e)}")
+                success = False
+            results["sports"][sport] = {"success": success}
+            if success:
+                successful += 1
+    
+    # Keep summary ordering stable regardless of completion order
+    results["sports"] = {sport: results["sports"][sport] for sport in SPORTS}
+    
+    # Grade finished games so accuracy reflects real outcomes
+    logger.info("[SETTLE] Settling completed games...")
+    try:
+        settled = settlement.settle_all(SPORTS)
+        logger.info(f"[SETTLE] {settled['settled']} predictions settled in {settled['elapsed_seconds']}s")
+    except Exception as e:
+        logger.error(f"[ERROR] Settlement failed: {str(e)}")
     
     # Check accuracy and retraining
     logger.info("[MONITOR] Checking accuracy metrics...")
@@ -113,9 +197,13 @@ def run_prediction_cycle():
         logger.info(f"[ACCURACY] {sport.upper()}: {accuracy:.2%}")
         
         if monitor.check_retraining_needed(sport):
-            logger.warning(f"[RETRAIN] Triggering retraining for {sport}...")
-            retrain_result = retrain_agent.trigger_retraining(sport)
-            logger.info(f"[RETRAIN] Result: {retrain_result}")
+            # Runs in the retrain process pool; the cycle does not wait for it
+            logger.warning(f"[RETRAIN] Queuing retraining for {sport}...")
+            retrain_status = retrain_scheduler.submit(sport)
+            logger.info(f"[RETRAIN] Status: {retrain_status.get('status')}")
+    
+    # Make sure this cycle's predictions are committed before reporting
+    db.flush()
     
     results["summary"] = {
         "total_sports": len(SPORTS),
@@ -123,6 +211,7 @@ def run_prediction_cycle():
         "failed": len(SPORTS) - successful
     }
     
+    logger.info(f"[VOICE] TTS queue: {tts_queue.get_stats()['depth']} pending, audio follows in the background")
     logger.info("=" * 60)
     logger.info(f"[CYCLE] Cycle complete: {successful}/{len(SPORTS)} successful")
     logger.info("=" * 60)
@@ -158,12 +247,19 @@ def main():
     logger.info(f"[CONFIG] Accuracy Threshold: {os.getenv('ACCURACY_THRESHOLD', 0.80)}")
     logger.info("=" * 60 + "\n")
     
+    init_services()
     try:
         schedule_predictions()
     except KeyboardInterrupt:
         logger.info("[SHUTDOWN] Shutting down...")
     except Exception as e:
         logger.error(f"[FATAL] {str(e)}")
+    finally:
+        tts_queue.close(timeout=30)
+        db.close(timeout=30)
+        retrain_scheduler.shutdown(wait=False)
+        odds_client.close()
+        analyzer.dispatcher.close()
 
 
 if __name__ == "__main__":
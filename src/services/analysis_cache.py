@@ -0,0 +1,138 @@
+"""
+Analysis cache - reuses LLM explanations for unchanged predictions.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fallback strings returned by the analyzer; never worth caching
+ERROR_ANALYSES = {"Analysis unavailable", "Unable to generate analysis"}
+
+
+def home_implied_probability(odds: Dict) -> Optional[float]:
+    """Mean home-team implied probability across bookmakers' h2h markets."""
+    home = odds.get("home_team")
+    probabilities = []
+    for bookmaker in odds.get("bookmakers", []):
+        for market in bookmaker.get("markets", []):
+            if market.get("key") != "h2h":
+                continue
+            for outcome in market.get("outcomes", []):
+                price = outcome.get("price")
+                if outcome.get("name") == home and price:
+                    probabilities.append(1 / price)
+    return sum(probabilities) / len(probabilities) if probabilities else None
+
+
+class AnalysisCache:
+    """Bounded in-memory LRU with TTL, optionally backed by SQLite on disk.
+    
+    Keys bucket confidence and market odds, so small model or line jitter
+    reuses the existing explanation instead of paying for a new completion.
+    """
+    
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """Initialize analysis cache."""
+        self.ttl = ttl or float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 21600))
+        self.max_entries = max_entries or int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 5000))
+        self.confidence_step = float(os.getenv("ANALYSIS_CACHE_CONFIDENCE_STEP", 0.05))
+        self.odds_step = float(os.getenv("ANALYSIS_CACHE_ODDS_STEP", 0.02))
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        path = path if path is not None else os.getenv("ANALYSIS_CACHE_PATH", "")
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis (key TEXT PRIMARY KEY, text TEXT, expires REAL)"
+                )
+                self._db.execute("DELETE FROM analysis WHERE expires < ?", (time.time(),))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Analysis cache disk store unavailable: {str(e)}")
+                self._db = None
+    
+    def _bucket(self, value: Optional[float], step: float) -> str:
+        """Quantize a probability to its bucket."""
+        if value is None:
+            return "na"
+        return str(round(round(value / step) * step, 4))
+    
+    def key(self, game_data: Dict, prediction: Dict, odds: Dict) -> str:
+        """Fingerprint: (sport, event, prediction, confidence bucket, odds bucket)."""
+        return "|".join([
+            str(game_data.get("sport", "")).lower(),
+            str(game_data.get("event_id") or game_data.get("game", "")),
+            str(prediction.get("prediction", "")),
+            self._bucket(prediction.get("confidence"), self.confidence_step),
+            self._bucket(home_implied_probability(odds or {}), self.odds_step)
+        ])
+    
+    def get(self, key: str) -> Optional[str]:
+        """Cached analysis for a key, if present and unexpired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT text, expires FROM analysis WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._remember(key, row[0], row[1])
+            return row[0]
+    
+    def put(self, key: str, text: Optional[str]):
+        """Store a successful analysis."""
+        if not text or text.strip() in ERROR_ANALYSES:
+            return
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, text, expires)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO analysis (key, text, expires) VALUES (?, ?, ?)",
+                        (key, text, expires)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Analysis cache write failed: {str(e)}")
+    
+    def _remember(self, key: str, text: str, expires: float):
+        """Insert into the in-memory LRU (lock held)."""
+        self._entries[key] = (expires, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,63 @@
+"""
+Shared AWS clients - one pooled S3 client per process.
+"""
+
+import os
+import threading
+from typing import Optional
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+_s3_client = None
+_transfer_config: Optional[TransferConfig] = None
+_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Process-wide S3 client with a sized connection pool, keep-alive and adaptive retries.
+    
+    boto3 clients are thread-safe once built, so every caller shares one and
+    reuses its connections. Creation is locked because building clients off
+    the default session is not.
+    """
+    global _s3_client
+    with _lock:
+        if _s3_client is None:
+            config = Config(
+                max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", 50)),
+                retries={"mode": "adaptive", "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", 5))},
+                tcp_keepalive=True,
+                connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT", 5)),
+                read_timeout=float(os.getenv("S3_READ_TIMEOUT", 60))
+            )
+            session = boto3.session.Session(
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=os.getenv("AWS_S3_REGION", "us-east-1")
+            )
+            # Point at a local S3 stand-in (MinIO, moto server) when set
+            _s3_client = session.client(
+                "s3",
+                endpoint_url=os.getenv("AWS_S3_ENDPOINT_URL") or None,
+                config=config
+            )
+            logger.info(f"S3 client initialized (pool {config.max_pool_connections})")
+        return _s3_client
+
+
+def get_transfer_config() -> TransferConfig:
+    """Managed-transfer settings for upload_file and friends."""
+    global _transfer_config
+    with _lock:
+        if _transfer_config is None:
+            _transfer_config = TransferConfig(
+                multipart_threshold=int(os.getenv("S3_MULTIPART_THRESHOLD_BYTES", 8 * 1024 * 1024)),
+                multipart_chunksize=int(os.getenv("S3_PART_SIZE_BYTES", 5 * 1024 * 1024)),
+                max_concurrency=int(os.getenv("S3_TRANSFER_CONCURRENCY", 10)),
+                use_threads=True
+            )
+        return _transfer_config
@@ -0,0 +1,150 @@
+"""
+Compiled inference for RandomForest + StandardScaler models.
+
+Flattens every tree into shared NumPy arrays and evaluates all trees for all
+rows at once, avoiding sklearn's per-call validation and per-tree dispatch.
+"""
+
+import numpy as np
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledForest:
+    """Array-backed forest evaluated with vectorized NumPy traversal."""
+    
+    def __init__(self, feature, threshold, children_left, children_right, value, roots, max_depth, mean=None, scale=None):
+        """Initialize from flattened tree arrays."""
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.mean = mean
+        self.scale = scale
+    
+    @classmethod
+    def from_sklearn(cls, model, scaler=None) -> "CompiledForest":
+        """Compile a fitted RandomForestClassifier (and optional StandardScaler)."""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left < 0
+            
+            # Leaves loop back to themselves and always "go left", so traversal
+            # can run a fixed number of steps without branching on leaf-ness
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            
+            node_value = tree.value[:, 0, :]
+            values.append(node_value / node_value.sum(axis=1, keepdims=True))
+            
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+        
+        mean = scale = None
+        if scaler is not None:
+            mean = getattr(scaler, "mean_", None)
+            scale = getattr(scaler, "scale_", None)
+        
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children_left=np.concatenate(lefts).astype(np.intp),
+            children_right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            mean=mean,
+            scale=scale
+        )
+    
+    def transform(self, X) -> np.ndarray:
+        """Apply the folded StandardScaler."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        return X
+    
+    def predict_proba(self, X, scaled: bool = False) -> np.ndarray:
+        """Class probabilities averaged over all trees, shape (n_rows, n_classes)."""
+        X = np.asarray(X, dtype=np.float64) if scaled else self.transform(X)
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = X.astype(np.float32)
+        
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.children_left[node], self.children_right[node])
+        
+        return self.value[node].mean(axis=1)
+
+
+def compile_model(model, scaler=None) -> Optional[CompiledForest]:
+    """Compile a model if it is a supported forest, else return None."""
+    if not hasattr(model, "estimators_") or not hasattr(model, "predict_proba"):
+        logger.warning(f"Cannot compile {type(model).__name__}, using sklearn backend")
+        return None
+    try:
+        return CompiledForest.from_sklearn(model, scaler)
+    except Exception as e:
+        logger.error(f"Error compiling model: {str(e)}")
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    
+    # Parity and latency check against sklearn
+    print("[COMPILED] Checking parity with sklearn predict_proba...")
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(2000, 10))
+    y = (X[:, 0] + 0.5 * X[:, 3] + rng.normal(scale=0.5, size=2000) > 0).astype(int)
+    
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=100, random_state=42).fit(scaler.transform(X), y)
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    
+    X_test = rng.normal(size=(500, 10))
+    expected = model.predict_proba(scaler.transform(X_test))
+    actual = compiled.predict_proba(X_test)
+    max_diff = float(np.abs(expected - actual).max())
+    
+    if max_diff > 1e-9:
+        print(f"[COMPILED] ❌ Parity failed: max abs diff {max_diff:.2e}")
+        sys.exit(1)
+    print(f"[COMPILED] ✅ Parity OK on {len(X_test)} rows (max abs diff {max_diff:.2e})")
+    
+    row = X_test[:1]
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        model.predict_proba(scaler.transform(row))
+    sklearn_ms = (time.perf_counter() - start) / runs * 1000
+    
+    start = time.perf_counter()
+    for _ in range(runs):
+        compiled.predict_proba(row)
+    compiled_ms = (time.perf_counter() - start) / runs * 1000
+    
+    print(f"[COMPILED] Single-row latency: sklearn {sklearn_ms:.3f} ms, compiled {compiled_ms:.3f} ms ({sklearn_ms / compiled_ms:.1f}x)")
@@ -0,0 +1,123 @@
+"""
+Feature extraction - turn raw Odds API payloads into a model feature matrix.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column order of the feature matrix (one row per event)
+FEATURE_NAMES = [
+    "home_implied_prob",
+    "away_implied_prob",
+    "draw_implied_prob",
+    "home_consensus_prob",
+    "away_consensus_prob",
+    "overround",
+    "home_prob_dispersion",
+    "spread_home_point",
+    "total_point",
+    "n_bookmakers",
+]
+
+# Fill values for features a slate does not quote
+FEATURE_DEFAULTS = np.array([0.5, 0.5, 0.0, 0.5, 0.5, 1.0, 0.0, 0.0, 0.0, 0.0])
+
+MARKET_CODES = {"h2h": 0, "spreads": 1, "totals": 2}
+HOME, AWAY, DRAW, OVER, UNDER, OTHER = range(6)
+
+
+def _flatten(events: List[Dict]) -> Tuple[np.ndarray, ...]:
+    """Flatten nested events into parallel per-outcome arrays.
+    
+    This is the only Python-level pass over the payload; everything after
+    it is vectorized across all events and bookmakers.
+    """
+    rows = [
+        (
+            event_idx,
+            book_idx,
+            MARKET_CODES.get(market.get("key"), -1),
+            HOME if outcome.get("name") == event.get("home_team")
+            else AWAY if outcome.get("name") == event.get("away_team")
+            else DRAW if outcome.get("name") == "Draw"
+            else OVER if outcome.get("name") == "Over"
+            else UNDER if outcome.get("name") == "Under"
+            else OTHER,
+            outcome.get("price") or np.nan,
+            np.nan if outcome.get("point") is None else outcome.get("point"),
+        )
+        for event_idx, event in enumerate(events)
+        for book_idx, bookmaker in enumerate(event.get("bookmakers", []))
+        for market in bookmaker.get("markets", [])
+        for outcome in market.get("outcomes", [])
+    ]
+    if not rows:
+        empty = np.empty(0)
+        return (empty.astype(np.intp),) * 4 + (empty, empty)
+    
+    data = np.array(rows, dtype=np.float64)
+    event_idx, book_idx, market, side = (data[:, i].astype(np.intp) for i in range(4))
+    return event_idx, book_idx, market, side, data[:, 4], data[:, 5]
+
+
+def _group_mean(groups: np.ndarray, values: np.ndarray, mask: np.ndarray, n: int) -> np.ndarray:
+    """Mean of values per group over masked rows; NaN for empty groups."""
+    valid = mask & ~np.isnan(values)
+    counts = np.bincount(groups[valid], minlength=n)
+    sums = np.bincount(groups[valid], weights=values[valid], minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def extract_features(events: List[Dict]) -> np.ndarray:
+    """Build an (n_events, n_features) matrix from an Odds API odds payload."""
+    n_events = len(events)
+    if n_events == 0:
+        return np.empty((0, len(FEATURE_NAMES)))
+    
+    event_idx, book_idx, market, side, price, point = _flatten(events)
+    implied = 1.0 / price
+    
+    # Overround per (event, bookmaker) h2h book, used to strip the vig
+    is_h2h = market == MARKET_CODES["h2h"]
+    max_books = int(book_idx.max()) + 1 if book_idx.size else 1
+    pair = event_idx * max_books + book_idx
+    book_total = np.bincount(
+        pair[is_h2h], weights=np.nan_to_num(implied[is_h2h]), minlength=n_events * max_books
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vig_free = implied / book_total[pair]
+    
+    home_h2h = is_h2h & (side == HOME)
+    away_h2h = is_h2h & (side == AWAY)
+    
+    # Spread of vig-free home probability across books
+    consensus_home = _group_mean(event_idx, vig_free, home_h2h, n_events)
+    home_sq = _group_mean(event_idx, vig_free ** 2, home_h2h, n_events)
+    dispersion = np.sqrt(np.clip(home_sq - consensus_home ** 2, 0.0, None))
+    
+    book_overround = np.full(n_events * max_books, np.nan)
+    has_book = np.bincount(pair[is_h2h], minlength=n_events * max_books) > 0
+    book_overround[has_book] = book_total[has_book]
+    book_event = np.repeat(np.arange(n_events), max_books)
+    
+    features = np.column_stack([
+        _group_mean(event_idx, implied, home_h2h, n_events),
+        _group_mean(event_idx, implied, away_h2h, n_events),
+        _group_mean(event_idx, implied, is_h2h & (side == DRAW), n_events),
+        consensus_home,
+        _group_mean(event_idx, vig_free, away_h2h, n_events),
+        _group_mean(book_event, book_overround, has_book, n_events),
+        dispersion,
+        _group_mean(event_idx, point, (market == MARKET_CODES["spreads"]) & (side == HOME), n_events),
+        _group_mean(event_idx, point, (market == MARKET_CODES["totals"]) & (side == OVER), n_events),
+        np.bincount(event_idx[home_h2h], minlength=n_events).astype(np.float64),
+    ])
+    
+    # Fill unquoted markets with neutral defaults
+    missing = np.isnan(features)
+    features[missing] = np.broadcast_to(FEATURE_DEFAULTS, features.shape)[missing]
+    return features
@@ -3,14 +3,22 @@ Firestore integration for storing predictions and meta-learning logs.
 """
 
 import os
-from datetime import datetime
-from typing import Dict, Optional
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
 import firebase_admin
 from firebase_admin import credentials, firestore
 import logging
 
+from services.firestore_writer import BufferedWriter
+from services.query_cache import QueryCache, query_cache
+
 logger = logging.getLogger(__name__)
 
+# Documents per get_all round trip when reading the prediction index
+INDEX_READ_CHUNK = 300
+# Games per settlement transaction (two writes each, under the 500-write limit)
+SETTLE_CHUNK = 200
+
 
 class FirestoreClient:
     """Manages Firestore operations for predictions and audit logs."""
@@ -30,53 +38,253 @@ class FirestoreClient:
         except Exception as e:
             logger.error(f"Firestore initialization error: {str(e)}")
             self.db = None
+        
+        self.cache = query_cache
+        self.writer = BufferedWriter(self.db, on_commit=self._on_commit) if self.db is not None else None
     
-    def save_prediction(self, sport: str, prediction_data: Dict) -> bool:
-        """Save prediction to Firestore."""
+    def _on_commit(self, paths: List[str]):
+        """Invalidate cached reads for sports touched by committed writes."""
+        for path in paths:
+            parts = path.split("/")
+            if parts[0] == "predictions" and len(parts) > 1:
+                self.cache.invalidate(parts[1].lower())
+            elif parts[0] == "accuracy_daily" and len(parts) > 1:
+                self.cache.invalidate(parts[1].rsplit("_", 1)[0].lower())
+    
+    @staticmethod
+    def prediction_path(sport: str, prediction_data: Dict) -> str:
+        """Document path for a prediction: predictions/{sport}/{date}/{game_id}."""
+        today = datetime.utcnow().date().isoformat()
+        game_id = prediction_data.get("game", "unknown").replace(" ", "_")
+        return f"predictions/{sport}/{today}/{game_id}"
+    
+    def save_prediction(self, sport: str, prediction_data: Dict, buffered: bool = False) -> bool:
+        """Save prediction to Firestore.
+        
+        With buffered=True the write is queued and committed in a batch by the
+        background writer; call flush() to wait for it.
+        """
         if self.db is None:
             logger.error("Firestore not initialized")
             return False
         
         try:
-            today = datetime.utcnow().date().isoformat()
-            game_id = prediction_data.get("game", "unknown").replace(" ", "_")
-            
-            # Path: predictions/{sport}/{date}/{game_id}
-            path = f"predictions/{sport}/{today}/{game_id}"
+            path = self.prediction_path(sport, prediction_data)
             
             data = {
                 **prediction_data,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": prediction_data.get("timestamp") or datetime.utcnow().isoformat(),
                 "sport": sport.upper()
             }
             
-            self.db.document(path).set(data)
+            # Event id -> latest prediction document, so settlement never scans;
+            # also the feed watch_predictions listens to. No "settled" field
+            # here: a re-save must never reopen a graded game
+            index = None
+            if data.get("event_id"):
+                index = (self.index_path(data["event_id"]), {
+                    "path": path,
+                    "sport": data["sport"],
+                    "game": data.get("game"),
+                    "prediction": data.get("prediction"),
+                    "confidence": data.get("confidence"),
+                    "commence_time": data.get("commence_time"),
+                    "audio_url": data.get("audio_url"),
+                    "timestamp": data["timestamp"],
+                    "updated_at": data["timestamp"]
+                })
+            
+            if buffered:
+                if index is not None:
+                    self.writer.enqueue(*index, merge=True)
+                return self.writer.enqueue(path, data)
+            
+            batch = self.db.batch()
+            batch.set(self.db.document(path), data)
+            if index is not None:
+                batch.set(self.db.document(index[0]), index[1], merge=True)
+            batch.commit()
+            self.cache.invalidate(sport.lower())
             logger.info(f"Prediction saved: {path}")
             return True
         except Exception as e:
             logger.error(f"Error saving prediction: {str(e)}")
             return False
     
+    def update_prediction(
+        self,
+        path: str,
+        fields: Dict,
+        buffered: bool = True,
+        event_id: Optional[str] = None
+    ) -> bool:
+        """Merge fields into a stored prediction (e.g. audio_url once voice is ready).
+        
+        With an event_id the fields are mirrored onto its index entry, so
+        prediction watchers see the change.
+        """
+        if self.db is None:
+            return False
+        
+        try:
+            writes = [(path, fields)]
+            if event_id:
+                writes.append((self.index_path(event_id), {**fields, "updated_at": datetime.utcnow().isoformat()}))
+            if buffered:
+                return all([self.writer.enqueue(p, data, merge=True) for p, data in writes])
+            batch = self.db.batch()
+            for p, data in writes:
+                batch.set(self.db.document(p), data, merge=True)
+            batch.commit()
+            self._on_commit([path])
+            return True
+        except Exception as e:
+            logger.error(f"Error updating prediction {path}: {str(e)}")
+            return False
+    
+    @staticmethod
+    def index_path(event_id: str) -> str:
+        """Document path for an event's prediction index entry."""
+        return f"prediction_index/{event_id}"
+    
+    def get_prediction_index(self, event_ids: List[str]) -> Dict[str, Dict]:
+        """Look up index entries for many events with batched reads."""
+        if self.db is None or not event_ids:
+            return {}
+        
+        entries = {}
+        try:
+            for start in range(0, len(event_ids), INDEX_READ_CHUNK):
+                refs = [self.db.document(self.index_path(e)) for e in event_ids[start:start + INDEX_READ_CHUNK]]
+                for doc in self.db.get_all(refs):
+                    if doc.exists:
+                        entries[doc.id] = doc.to_dict()
+        except Exception as e:
+            logger.error(f"Error reading prediction index: {str(e)}")
+        return entries
+    
+    def settle_predictions(self, settlements: List[tuple]) -> List[str]:
+        """Grade many predictions, each exactly once.
+        
+        settlements holds (event_id, entry, outcome) tuples. Each chunk runs in
+        one transaction that reads its index entries, claims the unsettled
+        ones, writes their outcomes onto the predictions and bumps each day's
+        accuracy counters once with the chunk's totals, so concurrent settlers
+        cannot double-count a game. Outcomes with correct=None (draws) are
+        closed without touching accuracy. Returns the event ids settled.
+        """
+        if self.db is None or not settlements:
+            return []
+        
+        settled = []
+        for start in range(0, len(settlements), SETTLE_CHUNK):
+            chunk = settlements[start:start + SETTLE_CHUNK]
+            settled_at = datetime.utcnow()
+            day = settled_at.date().isoformat()
+            refs = {event_id: self.db.document(self.index_path(event_id)) for event_id, _, _ in chunk}
+            
+            @firestore.transactional
+            def claim(transaction) -> List[tuple]:
+                open_ids = {
+                    doc.id for doc in transaction.get_all(list(refs.values()))
+                    if doc.exists and not (doc.to_dict() or {}).get("settled")
+                }
+                claimed = [item for item in chunk if item[0] in open_ids]
+                counters: Dict[str, Dict] = {}
+                for event_id, entry, outcome in claimed:
+                    transaction.update(refs[event_id], {
+                        **outcome,
+                        "settled": True,
+                        "updated_at": settled_at.isoformat()
+                    })
+                    transaction.set(
+                        self.db.document(entry["path"]),
+                        {**outcome, "settled": True, "settled_at": settled_at.isoformat()},
+                        merge=True
+                    )
+                    if outcome.get("correct") is None:
+                        continue
+                    counts = counters.setdefault(entry["sport"].upper(), {"settled": 0, "correct": 0})
+                    counts["settled"] += 1
+                    counts["correct"] += int(outcome["correct"])
+                for sport, counts in counters.items():
+                    transaction.set(self.db.document(self.accuracy_path(sport, day)), {
+                        "sport": sport,
+                        "date": day,
+                        "settled": firestore.Increment(counts["settled"]),
+                        "correct": firestore.Increment(counts["correct"])
+                    }, merge=True)
+                return claimed
+            
+            try:
+                claimed = claim(self.db.transaction())
+            except Exception as e:
+                logger.error(f"Error settling {len(chunk)} predictions: {str(e)}")
+                continue
+            settled.extend(event_id for event_id, _, _ in claimed)
+            self._on_commit(
+                [entry["path"] for _, entry, _ in claimed]
+                + [self.accuracy_path(entry["sport"], day) for _, entry, _ in claimed]
+            )
+        return settled
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for buffered writes to be committed."""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+    
+    def close(self, timeout: Optional[float] = None):
+        """Flush buffered writes and stop the background writer."""
+        if self.writer is not None:
+            self.writer.close(timeout)
+    
+    def watch_predictions(self, callback: Callable[[Dict], None]):
+        """Call callback with each prediction index entry changed from now on (any process).
+        
+        Prediction documents live in per-date collections that no single
+        query can listen to, so this watches prediction_index, which every
+        save, voice patch and settlement updates. Entries carry event_id.
+        Returns the Firestore watch handle; call unsubscribe() on it to stop.
+        """
+        if self.db is None:
+            return None
+        
+        def on_snapshot(_snapshot, changes, _read_time):
+            for change in changes:
+                if change.type.name in ("ADDED", "MODIFIED"):
+                    callback({**change.document.to_dict(), "event_id": change.document.id})
+        
+        try:
+            query = self.db.collection("prediction_index").where(
+                "updated_at", ">=", datetime.utcnow().isoformat()
+            )
+            return query.on_snapshot(on_snapshot)
+        except Exception as e:
+            logger.error(f"Error watching predictions: {str(e)}")
+            return None
+    
     def get_predictions(self, sport: str, date: str) -> list:
         """Fetch predictions for a sport on a specific date."""
         if self.db is None:
             return []
         
         try:
-            path = f"predictions/{sport}/{date}"
-            docs = self.db.collection_group("predictions").where(
-                "sport", "==", sport.upper()
-            ).where(
-                "timestamp", ">=", f"{date}T00:00:00"
-            ).where(
-                "timestamp", "<", f"{date}T23:59:59"
-            ).stream()
-            
-            return [doc.to_dict() for doc in docs]
+            return self.cache.get_or_load(
+                QueryCache.fingerprint("predictions", sport.upper(), date),
+                lambda: self._query_predictions(sport, date),
+                tags=[sport.lower()]
+            )
         except Exception as e:
             logger.error(f"Error fetching predictions: {str(e)}")
             return []
     
+    def _query_predictions(self, sport: str, date: str) -> list:
+        """Read the sport's collection for a date (predictions/{sport}/{date})."""
+        docs = self.db.collection(f"predictions/{sport.lower()}/{date}").stream()
+        
+        return [doc.to_dict() for doc in docs]
+    
     def save_meta_feedback(self, feedback_data: Dict) -> bool:
         """Save meta-learning feedback."""
         if self.db is None:
@@ -93,6 +301,7 @@ class FirestoreClient:
             }
             
             self.db.document(path).set(data, merge=True)
+            self.cache.invalidate("meta_feedback")
             logger.info(f"Meta feedback saved: {path}")
             return True
         except Exception as e:
@@ -105,39 +314,116 @@ class FirestoreClient:
             return []
         
         try:
-            docs = self.db.collection("meta_feedback").order_by(
-                "timestamp", direction=firestore.Query.DESCENDING
-            ).limit(days).stream()
-            
-            return [doc.to_dict() for doc in docs]
+            return self.cache.get_or_load(
+                QueryCache.fingerprint("meta_feedback", days),
+                lambda: self._query_meta_feedback(days),
+                tags=["meta_feedback"]
+            )
         except Exception as e:
             logger.error(f"Error fetching meta feedback: {str(e)}")
             return []
     
-    def calculate_accuracy(self, sport: str, days: int = 7) -> float:
-        """Calculate rolling accuracy for a sport."""
+    def _query_meta_feedback(self, days: int) -> list:
+        """Run the recent meta-feedback query against Firestore."""
+        docs = self.db.collection("meta_feedback").order_by(
+            "timestamp", direction=firestore.Query.DESCENDING
+        ).limit(days).stream()
+        
+        return [doc.to_dict() for doc in docs]
+    
+    def save_retrain_status(self, sport: str, status: Dict) -> bool:
+        """Save the latest retraining job status for a sport."""
         if self.db is None:
-            return 0.0
+            return False
         
         try:
-            # Query recent predictions
-            docs = self.db.collection_group("predictions").where(
-                "sport", "==", sport.upper()
-            ).limit(100).stream()
-            
-            predictions = [doc.to_dict() for doc in docs]
-            
-            if not predictions:
-                return 0.0
-            
-            # Calculate accuracy (mock - would compare with actual outcomes)
-            correct = sum(1 for p in predictions if p.get("correct", False))
-            total = len(predictions)
+            self.db.document(f"retrain_jobs/{sport}").set(status)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving retrain status: {str(e)}")
+            return False
+    
+    def get_retrain_status(self, sport: str) -> Optional[Dict]:
+        """Fetch the latest retraining job status for a sport."""
+        if self.db is None:
+            return None
+        
+        try:
+            doc = self.db.document(f"retrain_jobs/{sport}").get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error fetching retrain status: {str(e)}")
+            return None
+    
+    @staticmethod
+    def accuracy_path(sport: str, day: str) -> str:
+        """Document path for a sport's daily outcome counters."""
+        return f"accuracy_daily/{sport.upper()}_{day}"
+    
+    def record_outcome(
+        self,
+        sport: str,
+        correct: bool,
+        settled_at: Optional[datetime] = None,
+        buffered: bool = False
+    ) -> bool:
+        """Add one settled prediction to the sport's daily accuracy counters."""
+        if self.db is None:
+            logger.error("Firestore not initialized")
+            return False
+        
+        try:
+            day = (settled_at or datetime.utcnow()).date().isoformat()
+            path = self.accuracy_path(sport, day)
+            data = {
+                "sport": sport.upper(),
+                "date": day,
+                "settled": firestore.Increment(1),
+                "correct": firestore.Increment(1 if correct else 0)
+            }
             
-            accuracy = correct / total if total > 0 else 0.0
-            logger.info(f"Accuracy for {sport}: {accuracy:.2%}")
+            if buffered:
+                return self.writer.enqueue(path, data, merge=True)
             
-            return accuracy
+            self.db.document(path).set(data, merge=True)
+            self.cache.invalidate(sport.lower())
+            return True
+        except Exception as e:
+            logger.error(f"Error recording outcome: {str(e)}")
+            return False
+    
+    def calculate_accuracy(self, sport: str, days: int = 7) -> float:
+        """Calculate rolling accuracy for a sport over the last `days` days."""
+        if self.db is None:
+            return 0.0
+        
+        try:
+            return self.cache.get_or_load(
+                QueryCache.fingerprint("accuracy", sport.upper(), days, datetime.utcnow().date().isoformat()),
+                lambda: self._query_accuracy(sport, days),
+                tags=[sport.lower()]
+            )
         except Exception as e:
             logger.error(f"Error calculating accuracy: {str(e)}")
             return 0.0
+    
+    def _query_accuracy(self, sport: str, days: int) -> float:
+        """Sum the daily counter documents in the window (one read per day)."""
+        today = datetime.utcnow().date()
+        refs = [
+            self.db.document(self.accuracy_path(sport, (today - timedelta(days=offset)).isoformat()))
+            for offset in range(max(days, 1))
+        ]
+        
+        correct = 0
+        total = 0
+        for doc in self.db.get_all(refs):
+            if doc.exists:
+                counts = doc.to_dict()
+                correct += counts.get("correct", 0)
+                total += counts.get("settled", 0)
+        
+        accuracy = correct / total if total > 0 else 0.0
+        logger.info(f"Accuracy for {sport} over {days}d: {accuracy:.2%} ({correct}/{total})")
+        
+        return accuracy
@@ -0,0 +1,205 @@
+"""
+Buffered Firestore writes - groups document sets into WriteBatch commits.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+from google.api_core import exceptions as gexc
+
+from utils.rate_limit import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+WriteOp = Tuple[str, Dict, bool]
+
+# Rejections caused by a document in the batch: retrying cannot help, bisecting can
+PER_DOCUMENT_ERRORS = (gexc.InvalidArgument, gexc.FailedPrecondition, gexc.NotFound, gexc.AlreadyExists)
+# Rejections of the whole writer: every document would fail the same way
+FATAL_ERRORS = (gexc.PermissionDenied, gexc.Unauthenticated)
+
+
+class BufferedWriter:
+    """Background writer that flushes queued sets by size or by time.
+    
+    The queue is bounded; enqueue blocks once it is full so a Firestore
+    outage applies backpressure instead of growing memory. Transient failures
+    are retried with backoff and then put back at the head of the queue;
+    batches rejected because of a document are bisected so one bad document
+    cannot sink the rest of its batch.
+    """
+    
+    def __init__(
+        self,
+        db,
+        max_batch: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        on_commit: Optional[Callable[[List[str]], None]] = None
+    ):
+        """Initialize buffered writer."""
+        self.db = db
+        self.on_commit = on_commit
+        self.max_batch = min(MAX_BATCH_WRITES, max_batch or int(os.getenv("FIRESTORE_BATCH_SIZE", 200)))
+        self.flush_interval = flush_interval or float(os.getenv("FIRESTORE_FLUSH_SECONDS", 2))
+        self.max_pending = int(os.getenv("FIRESTORE_MAX_PENDING_WRITES", 5000))
+        self.max_retries = int(os.getenv("FIRESTORE_WRITE_RETRIES", 3))
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._closed = False
+        self._flush_requested = False
+        self._thread: Optional[threading.Thread] = None
+        self.committed = 0
+        self.batches = 0
+        self.retries = 0
+        self.requeued = 0
+        self.failed = 0
+    
+    def _ensure_thread(self):
+        """Start the flusher thread on first write."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="firestore-writer", daemon=True)
+            self._thread.start()
+    
+    def enqueue(self, path: str, data: Dict, merge: bool = False) -> bool:
+        """Queue a document set; blocks while the buffer is full."""
+        with self._cond:
+            if self._closed:
+                return False
+            self._ensure_thread()
+            while len(self._queue) >= self.max_pending:
+                self._cond.wait()
+            self._queue.append((path, data, merge))
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+        return True
+    
+    def _run(self):
+        """Flusher loop: commit a batch when full or when the interval elapses."""
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._closed or self._flush_requested) and len(self._queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                
+                if not self._queue:
+                    self._flush_requested = False
+                    if self._closed:
+                        return
+                    continue
+                
+                ops = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                if not self._queue:
+                    self._flush_requested = False
+                self._inflight += len(ops)
+                self._cond.notify_all()
+            
+            try:
+                self._commit(ops)
+            finally:
+                with self._cond:
+                    self._inflight -= len(ops)
+                    self._cond.notify_all()
+    
+    def _commit(self, ops: List[WriteOp]):
+        """Commit ops as one batch: retry transient failures, bisect per-document ones."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                batch = self.db.batch()
+                for path, data, merge in ops:
+                    batch.set(self.db.document(path), data, merge=merge)
+                batch.commit()
+                break
+            except PER_DOCUMENT_ERRORS as e:
+                logger.warning(f"Firestore batch of {len(ops)} rejected: {str(e)}")
+                self._bisect(ops)
+                return
+            except FATAL_ERRORS as e:
+                self.failed += len(ops)
+                logger.error(f"Dropping {len(ops)} Firestore writes: {str(e)}")
+                return
+            except Exception as e:
+                logger.warning(f"Firestore batch of {len(ops)} failed (attempt {attempt + 1}): {str(e)}")
+                if attempt < self.max_retries:
+                    self.retries += 1
+                    time.sleep(backoff_delay(attempt, base=0.5, cap=10))
+        else:
+            self._requeue(ops)
+            return
+        
+        # Outside the retry loop: a failing callback must never recommit the batch
+        self.committed += len(ops)
+        self.batches += 1
+        logger.info(f"Committed {len(ops)} Firestore writes")
+        if self.on_commit is not None:
+            try:
+                self.on_commit([path for path, _, _ in ops])
+            except Exception as e:
+                logger.error(f"Firestore commit callback failed: {str(e)}")
+    
+    def _bisect(self, ops: List[WriteOp]):
+        """Split a rejected batch until the offending document is isolated and dropped."""
+        if len(ops) > 1:
+            middle = len(ops) // 2
+            self._commit(ops[:middle])
+            self._commit(ops[middle:])
+        else:
+            self.failed += 1
+            logger.error(f"Dropping rejected Firestore write: {ops[0][0]}")
+    
+    def _requeue(self, ops: List[WriteOp]):
+        """Put a batch that kept failing transiently back at the head of the queue."""
+        with self._cond:
+            if self._closed:
+                self.failed += len(ops)
+                logger.error(f"Dropping {len(ops)} Firestore writes at shutdown after retries")
+                return
+            self._queue.extendleft(reversed(ops))
+            self.requeued += len(ops)
+        logger.warning(f"Requeued {len(ops)} Firestore writes after transient failures")
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is committed (or dropped)."""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            # Wake the flusher early rather than waiting out the interval
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._queue or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+    
+    def close(self, timeout: Optional[float] = None):
+        """Flush pending writes and stop the flusher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def get_stats(self) -> Dict:
+        """Get write pipeline counters."""
+        with self._cond:
+            pending = len(self._queue)
+        return {
+            "pending": pending,
+            "committed": self.committed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "requeued": self.requeued,
+            "failed": self.failed
+        }
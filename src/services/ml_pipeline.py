@@ -2,28 +2,34 @@
 ML Pipeline - Load and run predictions using trained models.
 """
 
+import os
 import joblib
 import numpy as np
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 import logging
 
+from services.model_registry import ModelRegistry
+from services.compiled_forest import compile_model
+
 logger = logging.getLogger(__name__)
 
 
 class MLPipeline:
     """Loads and runs ML predictions."""
     
-    def __init__(self, model_path: str = "models/model.pkl"):
+    def __init__(self, model_path: str = "models/model.pkl", registry: Optional[ModelRegistry] = None):
         """Initialize ML pipeline."""
         self.model_path = Path(model_path)
         self.scaler_path = self.model_path.parent / "scaler.pkl"
+        self.registry = registry or ModelRegistry(str(self.model_path.parent))
         self.model = None
         self.scaler = None
+        self.compiled = None
         self._load_models()
     
     def _load_models(self):
-        """Load trained model and scaler."""
+        """Load the shared fallback model and scaler used when a sport has no registry entry."""
         try:
             if self.model_path.exists():
                 self.model = joblib.load(self.model_path)
@@ -36,28 +42,65 @@ class MLPipeline:
                 logger.info("Scaler loaded successfully")
             else:
                 logger.warning(f"Scaler not found at {self.scaler_path}")
+            
+            if self.model is not None and self.scaler is not None and os.getenv("INFERENCE_BACKEND") == "compiled":
+                self.compiled = compile_model(self.model, self.scaler)
         except Exception as e:
             logger.error(f"Error loading models: {str(e)}")
     
-    def predict(self, features: list) -> Dict:
-        """Generate prediction with confidence."""
-        if self.model is None or self.scaler is None:
+    def predict_batch(self, X, sport: Optional[str] = None) -> Dict:
+        """Predict a whole slate in one vectorized pass.
+        
+        X is an (n_games, n_features) array. Returns columnar arrays; `win`,
+        `lose` and `confidence` are views into a single predict_proba output.
+        Uses the sport's registry model when one is published.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        
+        bundle = self.registry.get(sport) if sport else None
+        
+        if bundle is None and (self.model is None or self.scaler is None):
             logger.warning("Models not available, returning mock prediction")
-            return {
-                "prediction": "Win",
-                "confidence": 0.75,
-                "probability": {"lose": 0.25, "win": 0.75}
-            }
+            proba = np.tile([0.25, 0.75], (X.shape[0], 1))
+        else:
+            try:
+                if bundle is not None:
+                    proba = bundle.predict_proba(X)
+                elif self.compiled is not None:
+                    proba = self.compiled.predict_proba(X)
+                else:
+                    proba = self.model.predict_proba(self.scaler.transform(X))
+            except Exception as e:
+                logger.error(f"Prediction error: {str(e)}")
+                return {"error": str(e)}
         
-        try:
-            X = self.scaler.transform([features])
-            proba = self.model.predict_proba(X)[0]
-            
-            return {
-                "prediction": "Win" if proba[1] > 0.5 else "Loss",
-                "confidence": float(proba[1]),
-                "probability": {"lose": float(proba[0]), "win": float(proba[1])}
-            }
-        except Exception as e:
-            logger.error(f"Prediction error: {str(e)}")
-            return {"error": str(e)}
+        # A model trained on a single class (e.g. one-sided retrain labels) has one column
+        if proba.ndim != 2 or proba.shape[1] != 2:
+            logger.error(f"Prediction error: model returned {proba.shape} probabilities, expected 2 classes")
+            return {"error": f"Model returned probabilities for {proba.shape[-1]} class(es), expected 2"}
+        
+        win = proba[:, 1]
+        return {
+            "prediction": np.where(win > 0.5, "Win", "Loss"),
+            "confidence": win,
+            "win": win,
+            "lose": proba[:, 0]
+        }
+    
+    @staticmethod
+    def prediction_at(batch: Dict, i: int) -> Dict:
+        """Materialize one game's prediction dict from a batch result."""
+        if "error" in batch:
+            return {"error": batch["error"]}
+        
+        return {
+            "prediction": str(batch["prediction"][i]),
+            "confidence": float(batch["confidence"][i]),
+            "probability": {"lose": float(batch["lose"][i]), "win": float(batch["win"][i])}
+        }
+    
+    def predict(self, features: list, sport: Optional[str] = None) -> Dict:
+        """Generate prediction with confidence."""
+        return self.prediction_at(self.predict_batch([features], sport), 0)
@@ -0,0 +1,251 @@
+"""
+Versioned per-sport model registry with lazy loading, LRU residency and hot swap.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import joblib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from services.compiled_forest import compile_model
+
+logger = logging.getLogger(__name__)
+
+
+class ModelBundle:
+    """A loaded model/scaler pair for one sport and version."""
+    
+    def __init__(self, sport: str, version: str, model, scaler, metadata: Dict, size_bytes: int, compiled=None):
+        """Initialize model bundle."""
+        self.sport = sport
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.metadata = metadata
+        self.size_bytes = size_bytes
+        self.compiled = compiled
+    
+    def predict_proba(self, X):
+        """Class probabilities through the bundle's inference backend."""
+        if self.compiled is not None:
+            return self.compiled.predict_proba(X)
+        return self.model.predict_proba(self.scaler.transform(X))
+
+
+class ModelRegistry:
+    """Stores models as models/{sport}/{version}/ with a CURRENT pointer per sport.
+    
+    Publishing writes a complete version directory, renames it into place and
+    then atomically replaces CURRENT, so readers never see a half-written
+    pickle. Running processes notice a new CURRENT and load it in the
+    background while the previous version keeps serving.
+    """
+    
+    def __init__(self, root: str = "models"):
+        """Initialize model registry."""
+        self.root = Path(root)
+        self.memory_budget = int(os.getenv("MODEL_REGISTRY_MEMORY_MB", 512)) * 1024 * 1024
+        self.check_interval = float(os.getenv("MODEL_REGISTRY_CHECK_SECONDS", 30))
+        self.keep_versions = int(os.getenv("MODEL_REGISTRY_KEEP_VERSIONS", 3))
+        # Backoff before retrying a version that failed to load (doubles per failure)
+        self.retry_base = float(os.getenv("MODEL_REGISTRY_RETRY_SECONDS", 60))
+        self.retry_cap = float(os.getenv("MODEL_REGISTRY_RETRY_MAX_SECONDS", 3600))
+        self._resident: "OrderedDict[str, ModelBundle]" = OrderedDict()
+        self._pointers: Dict[str, tuple] = {}
+        self._loading: Dict[str, threading.Thread] = {}
+        # sport -> (version, failures, retry_at) for versions that failed to load
+        self._failed: Dict[str, tuple] = {}
+        self._sport_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+    
+    def _sport_lock(self, sport: str) -> threading.Lock:
+        """Lock serializing cold loads of one sport."""
+        with self._lock:
+            return self._sport_locks.setdefault(sport, threading.Lock())
+    
+    def current_version(self, sport: str, force: bool = False) -> Optional[str]:
+        """Read the CURRENT pointer, at most once per check interval."""
+        now = time.monotonic()
+        cached = self._pointers.get(sport)
+        if cached and not force and now - cached[1] < self.check_interval:
+            return cached[0]
+        
+        pointer = self.root / sport / "CURRENT"
+        try:
+            version = pointer.read_text().strip() or None
+        except FileNotFoundError:
+            version = None
+        self._pointers[sport] = (version, now)
+        return version
+    
+    def _backing_off(self, sport: str, version: str) -> bool:
+        """Whether a version failed recently and should not be loaded again yet."""
+        with self._lock:
+            failed = self._failed.get(sport)
+        return failed is not None and failed[0] == version and time.monotonic() < failed[2]
+    
+    def _record_failure(self, sport: str, version: str):
+        """Remember a failed load and schedule the next attempt."""
+        with self._lock:
+            previous = self._failed.get(sport)
+            failures = previous[1] + 1 if previous and previous[0] == version else 1
+            delay = min(self.retry_cap, self.retry_base * 2 ** (failures - 1))
+            self._failed[sport] = (version, failures, time.monotonic() + delay)
+        logger.warning(f"Not retrying {sport} model {version} for {delay:.0f}s ({failures} failed loads)")
+    
+    def load(self, sport: str, version: str) -> ModelBundle:
+        """Load a specific version from disk."""
+        version_dir = self.root / sport / version
+        model_file = version_dir / "model.pkl"
+        scaler_file = version_dir / "scaler.pkl"
+        metadata_file = version_dir / "metadata.json"
+        
+        metadata = json.loads(metadata_file.read_text()) if metadata_file.exists() else {}
+        model = joblib.load(model_file)
+        scaler = joblib.load(scaler_file)
+        
+        # Inference backend is chosen per model version, defaulting to the environment
+        backend = metadata.get("backend") or os.getenv("INFERENCE_BACKEND", "sklearn")
+        compiled = compile_model(model, scaler) if backend == "compiled" else None
+        
+        bundle = ModelBundle(
+            sport=sport,
+            version=version,
+            model=model,
+            scaler=scaler,
+            metadata=metadata,
+            size_bytes=model_file.stat().st_size + scaler_file.stat().st_size,
+            compiled=compiled
+        )
+        logger.info(f"Loaded {sport} model version {version} ({'compiled' if compiled else 'sklearn'} backend)")
+        return bundle
+    
+    def get(self, sport: str) -> Optional[ModelBundle]:
+        """Get the current model for a sport, loading it on first use."""
+        version = self.current_version(sport)
+        if version is None:
+            return None
+        
+        with self._lock:
+            bundle = self._resident.get(sport)
+            if bundle is not None:
+                self._resident.move_to_end(sport)
+        
+        if bundle is not None:
+            if bundle.version != version and not self._backing_off(sport, version):
+                self._swap_in_background(sport, version)
+            return bundle
+        
+        # Cold start: nothing to serve yet, load inline
+        if self._backing_off(sport, version):
+            return None
+        with self._sport_lock(sport):
+            with self._lock:
+                bundle = self._resident.get(sport)
+            if bundle is None:
+                try:
+                    bundle = self.load(sport, version)
+                except Exception as e:
+                    logger.error(f"Error loading {sport} model {version}: {str(e)}")
+                    self._record_failure(sport, version)
+                    return None
+                self._install(bundle)
+        return bundle
+    
+    def _swap_in_background(self, sport: str, version: str):
+        """Load a newer version off the request path, then swap it in."""
+        with self._lock:
+            loader = self._loading.get(sport)
+            if loader is not None and loader.is_alive():
+                return
+            loader = threading.Thread(
+                target=self._load_and_install,
+                args=(sport, version),
+                name=f"model-swap-{sport}",
+                daemon=True
+            )
+            self._loading[sport] = loader
+        loader.start()
+    
+    def _load_and_install(self, sport: str, version: str):
+        """Thread target for hot swaps."""
+        try:
+            self._install(self.load(sport, version))
+            logger.info(f"Hot-swapped {sport} model to version {version}")
+        except Exception as e:
+            logger.error(f"Hot swap failed for {sport} model {version}, keeping the resident model: {str(e)}")
+            self._record_failure(sport, version)
+    
+    def _install(self, bundle: ModelBundle):
+        """Make a bundle resident and evict LRU models over the memory budget."""
+        with self._lock:
+            self._failed.pop(bundle.sport, None)
+            self._resident[bundle.sport] = bundle
+            self._resident.move_to_end(bundle.sport)
+            
+            total = sum(b.size_bytes for b in self._resident.values())
+            while total > self.memory_budget and len(self._resident) > 1:
+                sport, evicted = self._resident.popitem(last=False)
+                total -= evicted.size_bytes
+                logger.info(f"Evicted {sport} model {evicted.version} from memory")
+    
+    def publish(self, sport: str, model, scaler, metadata: Optional[Dict] = None) -> str:
+        """Write a new model version and point CURRENT at it."""
+        sport_dir = self.root / sport
+        sport_dir.mkdir(parents=True, exist_ok=True)
+        version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        
+        # Write everything in a temp dir, then rename it into place
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=sport_dir))
+        try:
+            joblib.dump(model, tmp_dir / "model.pkl")
+            joblib.dump(scaler, tmp_dir / "scaler.pkl")
+            (tmp_dir / "metadata.json").write_text(json.dumps({
+                **(metadata or {}),
+                "sport": sport,
+                "version": version,
+                "published_at": datetime.utcnow().isoformat()
+            }))
+            os.rename(tmp_dir, sport_dir / version)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        fd, tmp_pointer = tempfile.mkstemp(prefix=".CURRENT-", dir=sport_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        os.replace(tmp_pointer, sport_dir / "CURRENT")
+        
+        self._pointers.pop(sport, None)
+        self._prune(sport, version)
+        logger.info(f"Published {sport} model version {version}")
+        return version
+    
+    def _prune(self, sport: str, current: str):
+        """Keep only the newest versions on disk."""
+        versions = sorted(
+            p.name for p in (self.root / sport).iterdir()
+            if p.is_dir() and not p.name.startswith(".")
+        )
+        for old in versions[:-self.keep_versions]:
+            if old != current:
+                shutil.rmtree(self.root / sport / old, ignore_errors=True)
+    
+    def get_stats(self) -> Dict:
+        """Get resident models and memory usage."""
+        with self._lock:
+            return {
+                "resident": {s: b.version for s, b in self._resident.items()},
+                "compiled": [s for s, b in self._resident.items() if b.compiled is not None],
+                "failed": {s: {"version": f[0], "failures": f[1]} for s, f in self._failed.items()},
+                "memory_bytes": sum(b.size_bytes for b in self._resident.values()),
+                "memory_budget_bytes": self.memory_budget
+            }
@@ -3,53 +3,142 @@ The Odds API integration for fetching real-time odds data.
 """
 
 import os
-import requests
+import asyncio
+import httpx
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 import logging
 
+from utils.concurrency import BackgroundLoop
+from services.odds_cache import OddsCache
+from services.odds_quota import OddsQuotaManager
+from utils.rate_limit import backoff_delay
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+DEFAULT_REGIONS = "us"
+DEFAULT_MARKETS = "h2h,spreads,totals"
 
-class OddsAPIClient:
-    """Fetches real-time odds from The Odds API for 8 sports."""
+# Internal sport name -> The Odds API sport key
+SPORT_KEYS = {
+    "nba": "basketball_nba",
+    "nfl": "americanfootball_nfl",
+    "mlb": "baseball_mlb",
+    "nhl": "icehockey_nhl",
+    "ncaaf": "americanfootball_ncaaf",
+    "ncaab": "basketball_ncaab",
+    "soccer": "soccer_epl",
+    "ufc": "mma_ufc"
+}
+
+
+class AsyncOddsAPIClient:
+    """Async Odds API client on a pooled, keep-alive HTTP/2 connection pool."""
     
-    def __init__(self):
-        """Initialize Odds API client."""
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[OddsCache] = None,
+        quota: Optional[OddsQuotaManager] = None
+    ):
+        """Initialize async Odds API client."""
         self.api_key = os.getenv("ODDS_API_KEY")
         self.base_url = "https://api.the-odds-api.com/v4"
-        self.sports = {
-            "nba": "basketball_nba",
-            "nfl": "americanfootball_nfl",
-            "mlb": "baseball_mlb",
-            "nhl": "icehockey_nhl",
-            "ncaaf": "americanfootball_ncaaf",
-            "ncaab": "basketball_ncaab",
-            "soccer": "soccer_epl",
-            "ufc": "mma_ufc"
-        }
-    
-    def get_odds(self, sport: str) -> Dict:
-        """Fetch live odds for a specific sport."""
+        self.sports = dict(SPORT_KEYS)
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("ODDS_API_MAX_CONNECTIONS", 10)),
+            max_keepalive_connections=max_keepalive or int(os.getenv("ODDS_API_MAX_KEEPALIVE", 5)),
+            keepalive_expiry=float(os.getenv("ODDS_API_KEEPALIVE_EXPIRY", 60))
+        )
+        self.timeout = httpx.Timeout(
+            timeout or float(os.getenv("ODDS_API_TIMEOUT", 10)),
+            connect=float(os.getenv("ODDS_API_CONNECT_TIMEOUT", 5))
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        if cache is None and os.getenv("ODDS_CACHE_ENABLED", "true").lower() == "true":
+            cache = OddsCache()
+        self.cache = cache
+        self.quota = quota or OddsQuotaManager()
+        self.max_retries = int(os.getenv("ODDS_API_MAX_RETRIES", 3))
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazily create the pooled HTTP client on the running loop."""
+        if self._client is None or self._client.is_closed:
+            try:
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    http2=True,
+                    limits=self.limits,
+                    timeout=self.timeout
+                )
+            except ImportError:
+                # h2 not installed, fall back to HTTP/1.1 keep-alive
+                logger.warning("HTTP/2 support unavailable, using HTTP/1.1")
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    limits=self.limits,
+                    timeout=self.timeout
+                )
+        return self._client
+    
+    async def get_odds(
+        self,
+        sport: str,
+        markets: str = DEFAULT_MARKETS,
+        regions: str = DEFAULT_REGIONS,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
+    ) -> Dict:
+        """Fetch live odds for a specific sport, served from the odds cache when enabled."""
+        if self.cache is None or not use_cache:
+            return await self._fetch_odds(sport, markets, regions, timeout)
+        
+        key = OddsCache.make_key(sport, markets, regions)
+        return await self.cache.get(
+            key,
+            lambda: self._fetch_odds(sport, markets, regions, timeout),
+            ttl=self.cache_ttl(sport)
+        )
+    
+    def cache_ttl(self, sport: str) -> float:
+        """Odds TTL for a sport: the quota's refresh interval, never below the configured cache TTL."""
+        return max(self.cache.ttl, self.quota.refresh_interval(sport.lower()))
+    
+    async def _fetch_odds(
+        self,
+        sport: str,
+        markets: str,
+        regions: str,
+        timeout: Optional[float]
+    ) -> Dict:
+        """Fetch odds from the upstream API."""
         sport_key = self.sports.get(sport.lower())
         if not sport_key:
             logger.error(f"Unknown sport: {sport}")
             return {}
         
+        cost = len(markets.split(",")) * len(regions.split(","))
+        if not await self.quota.acquire(self.api_key, cost):
+            return {}
+        
         try:
-            url = f"{self.base_url}/sports/{sport_key}/odds"
             params = {
                 "apiKey": self.api_key,
-                "regions": "us",
-                "markets": "h2h,spreads,totals"
+                "regions": regions,
+                "markets": markets
             }
-            
-            response = requests.get(url, params=params, timeout=10)
+            response = await self._get(f"/sports/{sport_key}/odds", params, timeout, sport)
             
             if response.status_code == 200:
                 logger.info(f"Fetched odds for {sport}")
-                return response.json()
+                data = response.json()
+                self.quota.observe_events(sport.lower(), data, cost)
+                return data
             else:
                 logger.error(f"API error for {sport}: {response.status_code}")
                 return {}
@@ -57,11 +146,104 @@ class OddsAPIClient:
             logger.error(f"Error fetching odds for {sport}: {str(e)}")
             return {}
     
+    async def _get(self, path: str, params: Dict, timeout: Optional[float], label: str) -> httpx.Response:
+        """GET with quota header tracking and Retry-After aware retries on 429."""
+        for attempt in range(self.max_retries + 1):
+            response = await self.client.get(
+                path,
+                params=params,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+            )
+            self.quota.update_from_headers(self.api_key, response.headers)
+            
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            
+            retry_after = response.headers.get("retry-after")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff_delay(attempt)
+            logger.warning(f"Rate limited fetching {label}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        return response
+    
+    async def get_scores(self, sport: str, days_from: int = 1, timeout: Optional[float] = None) -> List[Dict]:
+        """Fetch live and recently completed scores for a sport (up to 3 days back)."""
+        sport_key = self.sports.get(sport.lower())
+        if not sport_key:
+            logger.error(f"Unknown sport: {sport}")
+            return []
+        
+        # Scores cost 1 credit, or 2 when historical days are requested
+        params = {"apiKey": self.api_key}
+        cost = 1
+        if days_from:
+            params["daysFrom"] = min(max(days_from, 1), 3)
+            cost = 2
+        if not await self.quota.acquire(self.api_key, cost, pool="scores"):
+            return []
+        
+        try:
+            response = await self._get(f"/sports/{sport_key}/scores", params, timeout, f"{sport} scores")
+            if response.status_code == 200:
+                logger.info(f"Fetched scores for {sport}")
+                return response.json()
+            logger.error(f"Scores API error for {sport}: {response.status_code}")
+            return []
+        except Exception as e:
+            logger.error(f"Error fetching scores for {sport}: {str(e)}")
+            return []
+    
+    async def get_all_scores(self, sports: Optional[List[str]] = None, days_from: int = 1) -> Dict[str, List]:
+        """Fetch scores for several sports concurrently."""
+        sports = sports or list(self.sports.keys())
+        results = await asyncio.gather(*(self.get_scores(sport, days_from) for sport in sports))
+        return dict(zip(sports, results))
+    
+    async def get_all_sports(self) -> Dict[str, List]:
+        """Fetch odds for all supported sports concurrently."""
+        sports = list(self.sports.keys())
+        results = await asyncio.gather(*(self.get_odds(sport) for sport in sports))
+        return {sport: odds for sport, odds in zip(sports, results) if odds}
+    
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OddsAPIClient:
+    """Fetches real-time odds from The Odds API for 8 sports.
+    
+    Sync shim over AsyncOddsAPIClient: requests run on a private event loop
+    thread so every caller thread shares one connection pool.
+    """
+    
+    def __init__(self):
+        """Initialize Odds API client."""
+        self._async_client = AsyncOddsAPIClient()
+        self._loop = BackgroundLoop(name="odds-api-loop")
+        self.api_key = self._async_client.api_key
+        self.base_url = self._async_client.base_url
+        self.sports = self._async_client.sports
+        self.cache = self._async_client.cache
+    
+    def get_odds(self, sport: str, use_cache: bool = True) -> Dict:
+        """Fetch live odds for a specific sport."""
+        return self._loop.run(self._async_client.get_odds(sport, use_cache=use_cache))
+    
     def get_all_sports(self) -> Dict[str, List]:
         """Fetch odds for all supported sports."""
-        all_odds = {}
-        for sport in self.sports.keys():
-            odds = self.get_odds(sport)
-            if odds:
-                all_odds[sport] = odds
-        return all_odds
+        return self._loop.run(self._async_client.get_all_sports())
+    
+    def get_scores(self, sport: str, days_from: int = 1) -> List[Dict]:
+        """Fetch recent scores for a sport."""
+        return self._loop.run(self._async_client.get_scores(sport, days_from))
+    
+    def get_all_scores(self, sports: Optional[List[str]] = None, days_from: int = 1) -> Dict[str, List]:
+        """Fetch recent scores for several sports concurrently."""
+        return self._loop.run(self._async_client.get_all_scores(sports, days_from))
+    
+    def close(self):
+        """Close pooled connections and stop the loop thread."""
+        self._loop.run(self._async_client.aclose())
+        self._loop.stop()
@@ -0,0 +1,112 @@
+"""
+In-process odds cache with TTL, stale-while-revalidate and single-flight loads.
+"""
+
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+class OddsCache:
+    """Caches odds payloads keyed by (sport, markets, regions).
+    
+    Concurrent misses for the same key share one upstream call; entries past
+    their TTL are served stale for a grace period while a single background
+    refresh runs.
+    """
+    
+    def __init__(self, ttl: Optional[float] = None, stale_ttl: Optional[float] = None):
+        """Initialize odds cache."""
+        self.ttl = ttl if ttl is not None else float(os.getenv("ODDS_CACHE_TTL_SECONDS", 60))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("ODDS_CACHE_STALE_SECONDS", 240))
+        self._entries: Dict[CacheKey, Tuple[float, Any]] = {}
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.refreshes = 0
+    
+    @staticmethod
+    def make_key(sport: str, markets: str, regions: str) -> CacheKey:
+        """Build a cache key."""
+        return (sport.lower(), markets, regions)
+    
+    async def get(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Return cached odds for key, loading through loader on a miss."""
+        ttl = self.ttl if ttl is None else ttl
+        entry = self._entries.get(key)
+        
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < ttl:
+                self.hits += 1
+                return entry[1]
+            if age < ttl + self.stale_ttl:
+                # Serve stale and revalidate in the background
+                self.stale_served += 1
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    self._start_load(key, loader)
+                return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_load(key, loader)
+        
+        return await asyncio.shield(task)
+    
+    def _start_load(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start the single in-flight load for key."""
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = task
+        return task
+    
+    async def _load(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Run loader and store a non-empty result."""
+        try:
+            value = await loader()
+            # Empty payloads are upstream errors, never cache them
+            if value:
+                self._entries[key] = (time.monotonic(), value)
+            return value
+        except Exception as e:
+            logger.error(f"Odds cache load failed for {key}: {str(e)}")
+            return {}
+        finally:
+            self._inflight.pop(key, None)
+    
+    def invalidate(self, sport: Optional[str] = None):
+        """Drop cached entries for a sport, or everything."""
+        if sport is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == sport.lower()]:
+            self._entries.pop(key, None)
+    
+    def get_stats(self) -> Dict:
+        """Get cache counters."""
+        lookups = self.hits + self.misses + self.coalesced + self.stale_served
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            "refreshes": self.refreshes,
+            "entries": len(self._entries),
+            "hit_rate": (self.hits + self.coalesced + self.stale_served) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,112 @@
+"""
+Odds snapshot store - diff new odds payloads against the last processed lines.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (bookmaker, market) -> outcome name -> (price, point)
+EventSnapshot = Dict[Tuple[str, str], Dict[str, Tuple[float, Optional[float]]]]
+
+
+def snapshot_event(event: Dict) -> EventSnapshot:
+    """Flatten an Odds API event into comparable (bookmaker, market) lines."""
+    snapshot = {}
+    for bookmaker in event.get("bookmakers", []):
+        for market in bookmaker.get("markets", []):
+            snapshot[(bookmaker.get("key"), market.get("key"))] = {
+                outcome.get("name"): (outcome.get("price"), outcome.get("point"))
+                for outcome in market.get("outcomes", [])
+            }
+    return snapshot
+
+
+class OddsSnapshotStore:
+    """Keeps the last processed lines per event, bookmaker and market.
+    
+    Baselines only advance when an event is committed, so slow drift below
+    the threshold still accumulates into a change eventually.
+    """
+    
+    def __init__(self, price_threshold: Optional[float] = None, point_threshold: Optional[float] = None):
+        """Initialize snapshot store."""
+        # Minimum implied-probability move and spread/total point move that count as a change
+        self.price_threshold = price_threshold if price_threshold is not None else float(os.getenv("ODDS_MOVE_THRESHOLD", 0.01))
+        self.point_threshold = point_threshold if point_threshold is not None else float(os.getenv("ODDS_POINT_MOVE_THRESHOLD", 0.5))
+        self._snapshots: Dict[str, Dict[str, EventSnapshot]] = {}
+        self._lock = threading.Lock()
+    
+    def _line_changes(self, old: EventSnapshot, new: EventSnapshot) -> List[Dict]:
+        """List line movements that cross the configured thresholds."""
+        changes = []
+        for (bookmaker, market), outcomes in new.items():
+            previous = old.get((bookmaker, market))
+            if previous is None:
+                changes.append({"bookmaker": bookmaker, "market": market, "type": "added"})
+                continue
+            
+            for name, (price, point) in outcomes.items():
+                old_price, old_point = previous.get(name, (None, None))
+                price_move = (
+                    abs(1 / price - 1 / old_price)
+                    if price and old_price else float("inf")
+                )
+                point_move = (
+                    abs(point - old_point)
+                    if point is not None and old_point is not None else 0.0
+                )
+                if price_move >= self.price_threshold or point_move >= self.point_threshold:
+                    changes.append({
+                        "bookmaker": bookmaker,
+                        "market": market,
+                        "outcome": name,
+                        "type": "moved",
+                        "price": [old_price, price],
+                        "point": [old_point, point]
+                    })
+        return changes
+    
+    def diff(self, sport: str, events: List[Dict]) -> Dict:
+        """Diff a fresh odds payload against the stored baselines for a sport."""
+        with self._lock:
+            baselines = self._snapshots.setdefault(sport, {})
+            current_ids = {event.get("id") for event in events}
+            
+            # Events no longer listed have finished; drop their baselines
+            removed = [event_id for event_id in baselines if event_id not in current_ids]
+            for event_id in removed:
+                del baselines[event_id]
+            
+            new, changed, changed_events = [], {}, []
+            for event in events:
+                event_id = event.get("id")
+                baseline = baselines.get(event_id)
+                if baseline is None:
+                    new.append(event_id)
+                    changed_events.append(event)
+                    continue
+                
+                line_changes = self._line_changes(baseline, snapshot_event(event))
+                if line_changes:
+                    changed[event_id] = line_changes
+                    changed_events.append(event)
+        
+        return {
+            "sport": sport,
+            "new": new,
+            "changed": changed,
+            "removed": removed,
+            "unchanged": len(events) - len(changed_events),
+            "events": changed_events
+        }
+    
+    def commit(self, sport: str, events: List[Dict]):
+        """Advance baselines for events that were processed downstream."""
+        with self._lock:
+            baselines = self._snapshots.setdefault(sport, {})
+            for event in events:
+                baselines[event.get("id")] = snapshot_event(event)
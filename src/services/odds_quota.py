@@ -0,0 +1,142 @@
+"""
+Quota budgeting for The Odds API: token buckets fed by the usage headers.
+"""
+
+import os
+import calendar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import logging
+
+from utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def _reset_date(year: int, month: int, reset_day: int) -> datetime:
+    """Reset moment in a month, on the last day when the month is shorter than reset_day."""
+    day = min(reset_day, calendar.monthrange(year, month)[1])
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def _seconds_until_reset(reset_day: int, now: Optional[datetime] = None) -> float:
+    """Seconds until the monthly quota resets (UTC, on reset_day)."""
+    now = now or datetime.now(timezone.utc)
+    reset = _reset_date(now.year, now.month, reset_day)
+    if now >= reset:
+        year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+        reset = _reset_date(year, month, reset_day)
+    return max(60.0, (reset - now).total_seconds())
+
+
+class OddsQuotaManager:
+    """Spreads a fixed monthly request budget across sports.
+    
+    Each API key gets a token bucket refilled at remaining / time-to-reset, so
+    the quota lasts the whole month. Refresh intervals per sport shrink when
+    games are live and grow as the budget runs down.
+    
+    Scores requests draw from a separate "scores" pool holding a fixed share
+    of the budget, sized for a full settlement pass, so odds refreshes can
+    never starve settlement.
+    """
+    
+    def __init__(self):
+        """Initialize quota manager."""
+        self.monthly_quota = int(os.getenv("ODDS_API_MONTHLY_QUOTA", 20000))
+        self.reset_day = int(os.getenv("ODDS_API_QUOTA_RESET_DAY", 1))
+        self.burst = float(os.getenv("ODDS_API_BURST_CREDITS", 30))
+        # Settlement reserve: 8 sports at 2 credits each (daysFrom) per pass
+        self.scores_burst = float(os.getenv("ODDS_API_SCORES_BURST_CREDITS", 16))
+        self.scores_share = float(os.getenv("ODDS_API_SCORES_SHARE", 0.2))
+        self.max_wait = float(os.getenv("ODDS_API_QUOTA_MAX_WAIT", 5))
+        self.live_weight = float(os.getenv("ODDS_REFRESH_LIVE_WEIGHT", 4))
+        self.min_interval = float(os.getenv("ODDS_REFRESH_MIN_SECONDS", 30))
+        self.max_interval = float(os.getenv("ODDS_REFRESH_MAX_SECONDS", 3600))
+        # (api key, pool) -> bucket, pool being "odds" or "scores"
+        self.buckets: Dict[tuple, TokenBucket] = {}
+        self.remaining: Dict[str, int] = {}
+        self.used: Dict[str, int] = {}
+        self.live_sports: Dict[str, bool] = {}
+        self.request_cost: Dict[str, int] = {}
+        self.throttled = 0
+    
+    def _budget_rate(self, remaining: float, pool: str = "odds") -> float:
+        """Credits per second that keep a pool's share of the budget alive until reset."""
+        share = self.scores_share if pool == "scores" else 1.0 - self.scores_share
+        return remaining * share / _seconds_until_reset(self.reset_day)
+    
+    def bucket(self, api_key: Optional[str], pool: str = "odds") -> TokenBucket:
+        """Get or create the token bucket for an API key and pool."""
+        key = (api_key or "default", pool)
+        if key not in self.buckets:
+            remaining = self.remaining.get(key[0], self.monthly_quota)
+            burst = self.scores_burst if pool == "scores" else self.burst
+            self.buckets[key] = TokenBucket(self._budget_rate(remaining, pool), burst)
+        return self.buckets[key]
+    
+    async def acquire(self, api_key: Optional[str], cost: int, pool: str = "odds") -> bool:
+        """Reserve credits for a request, waiting at most max_wait seconds."""
+        acquired = await self.bucket(api_key, pool).acquire(cost, max_wait=self.max_wait)
+        if not acquired:
+            self.throttled += 1
+            logger.warning(f"Odds API {pool} budget exhausted, deferring request (cost {cost})")
+        return acquired
+    
+    def update_from_headers(self, api_key: Optional[str], headers) -> None:
+        """Re-tune the buckets from x-requests-remaining / x-requests-used."""
+        key = api_key or "default"
+        try:
+            remaining = headers.get("x-requests-remaining")
+            used = headers.get("x-requests-used")
+            if used is not None:
+                self.used[key] = int(float(used))
+            if remaining is None:
+                return
+            
+            remaining = int(float(remaining))
+            self.remaining[key] = remaining
+            for pool in ("odds", "scores"):
+                bucket = self.bucket(api_key, pool)
+                bucket.configure(rate=self._budget_rate(remaining, pool))
+                bucket.cap_tokens(remaining)
+            
+            if remaining < self.burst:
+                logger.warning(f"Odds API quota nearly exhausted: {remaining} credits left")
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid Odds API quota headers: {str(e)}")
+    
+    def observe_events(self, sport: str, events: List[Dict], cost: int) -> None:
+        """Record whether a sport has games in progress and what a refresh costs."""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.live_sports[sport] = any(
+            event.get("commence_time", "9999") <= now for event in events or []
+        )
+        self.request_cost[sport] = cost
+    
+    def refresh_interval(self, sport: str) -> float:
+        """Seconds between refreshes for a sport under the current budget."""
+        rate = min(
+            (b.rate for (_, pool), b in self.buckets.items() if pool == "odds"),
+            default=self._budget_rate(self.monthly_quota)
+        )
+        if rate <= 0:
+            return self.max_interval
+        
+        sports = self.request_cost or {sport: 3}
+        weights = {s: self.live_weight if self.live_sports.get(s) else 1.0 for s in sports}
+        weights.setdefault(sport, self.live_weight if self.live_sports.get(sport) else 1.0)
+        share = rate * weights[sport] / sum(weights.values())
+        
+        interval = self.request_cost.get(sport, 3) / share
+        return min(self.max_interval, max(self.min_interval, interval))
+    
+    def get_stats(self) -> Dict:
+        """Get quota usage and per-sport refresh intervals."""
+        return {
+            "remaining": dict(self.remaining),
+            "used": dict(self.used),
+            "throttled": self.throttled,
+            "live_sports": [s for s, live in self.live_sports.items() if live],
+            "refresh_intervals": {s: round(self.refresh_interval(s), 1) for s in self.request_cost}
+        }
@@ -0,0 +1,338 @@
+"""
+OpenAI dispatcher - shared async client with rate-limit-aware scheduling.
+"""
+
+import os
+import re
+import queue
+import asyncio
+import itertools
+import threading
+import concurrent.futures
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+import logging
+
+import openai
+from openai import AsyncOpenAI
+
+from utils.concurrency import BackgroundLoop
+from utils.rate_limit import TokenBucket, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes: lower runs first
+INTERACTIVE = 0
+BATCH = 1
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Marks the end of a streamed response in consumer queues
+_STREAM_END = object()
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset durations like '1s', '6m0s' or '250ms' into seconds."""
+    if not value:
+        return None
+    total = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value):
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+
+class OpenAIDispatcher:
+    """Runs every OpenAI call on one background event loop.
+    
+    Requests wait for both an RPM and a TPM token bucket, whose limits track
+    the x-ratelimit-* response headers. A fixed pool of workers caps in-flight
+    calls and always takes interactive work before batch work. Rate limits,
+    connection errors and 5xx are retried with jittered backoff.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None):
+        """Initialize OpenAI dispatcher."""
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        rpm = float(os.getenv("OPENAI_RPM_LIMIT", 500))
+        tpm = float(os.getenv("OPENAI_TPM_LIMIT", 200000))
+        self.requests = TokenBucket(rate=rpm / 60, capacity=rpm)
+        self.tokens = TokenBucket(rate=tpm / 60, capacity=tpm)
+        self.max_in_flight = int(os.getenv("OPENAI_MAX_IN_FLIGHT", 8))
+        self.max_retries = int(os.getenv("OPENAI_MAX_RETRIES", 4))
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", 60))
+        # Streamed audio: bytes per chunk and chunks buffered ahead of the consumer
+        self.audio_chunk_size = int(os.getenv("OPENAI_AUDIO_CHUNK_BYTES", 65536))
+        self.audio_buffer_chunks = int(os.getenv("OPENAI_AUDIO_BUFFER_CHUNKS", 16))
+        self._loop: Optional[BackgroundLoop] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+    
+    def _ensure_started(self) -> BackgroundLoop:
+        """Start the loop thread, client and workers on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = BackgroundLoop(name="openai-dispatch")
+                self._loop.run(self._start())
+            return self._loop
+    
+    async def _start(self):
+        """Create loop-bound state (runs on the dispatcher loop)."""
+        self._client = AsyncOpenAI(api_key=self.api_key, max_retries=0, timeout=self.timeout)
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_in_flight)]
+    
+    def submit(
+        self,
+        kind: str,
+        params: Dict,
+        priority: int = BATCH,
+        estimated_tokens: int = 0,
+        sink: Optional[Callable[[str], None]] = None
+    ) -> concurrent.futures.Future:
+        """Queue a call; returns a future resolved with the parsed response.
+        
+        For kind "chat_stream", sink receives each text delta as it arrives
+        and the future resolves with the full text. For kind "speech_stream",
+        sink is a bounded asyncio.Queue that receives audio chunks followed by
+        an end marker; the future resolves with the byte count.
+        """
+        loop = self._ensure_started()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        job = (priority, next(self._sequence), kind, params, estimated_tokens, future, sink)
+        loop.loop.call_soon_threadsafe(self._queue.put_nowait, job)
+        return future
+    
+    def chat(self, priority: int = BATCH, **params) -> Any:
+        """Blocking chat completion through the dispatcher."""
+        return self.submit("chat", params, priority, self.estimate_tokens(params)).result()
+    
+    async def achat(self, priority: int = INTERACTIVE, **params) -> Any:
+        """Chat completion awaitable from any other event loop."""
+        return await asyncio.wrap_future(self.submit("chat", params, priority, self.estimate_tokens(params)))
+    
+    def stream_chat(self, priority: int = INTERACTIVE, **params) -> Iterator[str]:
+        """Blocking generator of chat completion text deltas."""
+        deltas: queue.Queue = queue.Queue()
+        future = self.submit("chat_stream", params, priority, self.estimate_tokens(params), deltas.put)
+        future.add_done_callback(lambda _: deltas.put(_STREAM_END))
+        while True:
+            delta = deltas.get()
+            if delta is _STREAM_END:
+                break
+            yield delta
+        future.result()
+    
+    async def astream_chat(self, priority: int = INTERACTIVE, **params) -> AsyncIterator[str]:
+        """Async generator of chat completion text deltas, usable from any event loop."""
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+        
+        def sink(item):
+            loop.call_soon_threadsafe(deltas.put_nowait, item)
+        
+        future = self.submit("chat_stream", params, priority, self.estimate_tokens(params), sink)
+        future.add_done_callback(lambda _: sink(_STREAM_END))
+        while True:
+            delta = await deltas.get()
+            if delta is _STREAM_END:
+                break
+            yield delta
+        future.result()
+    
+    def speech(self, priority: int = BATCH, **params) -> Any:
+        """Blocking text-to-speech call through the dispatcher."""
+        return self.submit("speech", params, priority, 0).result()
+    
+    def stream_speech(self, priority: int = BATCH, **params) -> Iterator[bytes]:
+        """Blocking generator of synthesized audio chunks as they are downloaded.
+        
+        Chunks pass through a bounded queue, so a slow consumer holds back the
+        download instead of letting audio accumulate in memory.
+        """
+        loop = self._ensure_started().loop
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=self.audio_buffer_chunks)
+        future = self.submit("speech_stream", params, priority, 0, chunks)
+        finished = False
+        try:
+            while True:
+                chunk = asyncio.run_coroutine_threadsafe(chunks.get(), loop).result()
+                if chunk is _STREAM_END:
+                    finished = True
+                    break
+                yield chunk
+        finally:
+            if not finished:
+                # Consumer gave up: keep draining so the worker is not left blocked
+                asyncio.run_coroutine_threadsafe(self._drain(chunks), loop)
+        future.result()
+    
+    @staticmethod
+    async def _drain(chunks: asyncio.Queue):
+        """Discard chunks until the end marker arrives."""
+        while await chunks.get() is not _STREAM_END:
+            pass
+    
+    @staticmethod
+    def estimate_tokens(params: Dict) -> int:
+        """Rough prompt + completion token count for TPM budgeting."""
+        chars = sum(len(str(m.get("content", ""))) for m in params.get("messages", []))
+        return chars // 4 + int(params.get("max_tokens") or 0)
+    
+    async def _worker(self):
+        """Take the highest-priority job and run it."""
+        while True:
+            _, _, kind, params, tokens, future, sink = await self._queue.get()
+            if future.set_running_or_notify_cancel():
+                self.in_flight += 1
+                try:
+                    future.set_result(await self._execute(kind, params, tokens, sink))
+                    self.completed += 1
+                except Exception as e:
+                    self.failed += 1
+                    future.set_exception(e)
+                finally:
+                    self.in_flight -= 1
+            self._queue.task_done()
+    
+    async def _execute(self, kind: str, params: Dict, tokens: int, sink: Optional[Callable[[str], None]] = None) -> Any:
+        """Wait for rate-limit budget, call the API and retry transient failures."""
+        if kind == "speech_stream":
+            try:
+                return await self._execute_speech_stream(params, sink)
+            finally:
+                try:
+                    await asyncio.wait_for(sink.put(_STREAM_END), self.timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("Speech stream consumer stalled; end marker dropped")
+        
+        endpoint = (
+            self._client.audio.speech if kind == "speech" else self._client.chat.completions
+        ).with_raw_response
+        if kind == "chat_stream":
+            params = {**params, "stream": True}
+        
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire(1)
+            if tokens:
+                await self.tokens.acquire(tokens)
+            streamed = False
+            try:
+                raw = await endpoint.create(**params)
+                self._update_limits(raw.headers)
+                if kind != "chat_stream":
+                    return raw.parse()
+                
+                parts = []
+                async for chunk in raw.parse():
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        streamed = True
+                        parts.append(delta)
+                        sink(delta)
+                return "".join(parts)
+            except RETRYABLE_ERRORS as e:
+                # A retry after partial output would repeat text the consumer already has
+                if attempt == self.max_retries or streamed:
+                    raise
+                await self._retry_wait(kind, attempt, e)
+    
+    async def _execute_speech_stream(self, params: Dict, chunks: asyncio.Queue) -> int:
+        """Stream speech audio into a bounded queue, retrying only before the first chunk."""
+        endpoint = self._client.audio.speech.with_streaming_response
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire(1)
+            total = 0
+            try:
+                async with endpoint.create(**params) as response:
+                    self._update_limits(response.headers)
+                    async for chunk in response.iter_bytes(self.audio_chunk_size):
+                        total += len(chunk)
+                        await asyncio.wait_for(chunks.put(chunk), self.timeout)
+                return total
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries or total:
+                    raise
+                await self._retry_wait("speech_stream", attempt, e)
+    
+    async def _retry_wait(self, kind: str, attempt: int, error: Exception):
+        """Sleep before retrying a transient failure, honouring rate-limit headers."""
+        delay = backoff_delay(attempt)
+        if isinstance(error, openai.RateLimitError):
+            self.rate_limited += 1
+            delay = max(delay, self._rate_limit_delay(error.response.headers))
+        self.retries += 1
+        logger.warning(f"OpenAI {kind} call failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    
+    def _rate_limit_delay(self, headers) -> float:
+        """Seconds to wait after a 429, from Retry-After or the reset headers."""
+        self._update_limits(headers)
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        resets = [
+            parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+            for kind in ("requests", "tokens")
+            if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+        ]
+        return max([r for r in resets if r is not None], default=0.0)
+    
+    def _update_limits(self, headers):
+        """Track the account's RPM/TPM limits and remaining budget from headers."""
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                if limit is not None and float(limit) != bucket.capacity:
+                    bucket.configure(rate=float(limit) / 60, capacity=float(limit))
+                if remaining is not None:
+                    bucket.cap_tokens(float(remaining))
+            except ValueError:
+                continue
+    
+    def get_stats(self) -> Dict:
+        """Get dispatcher counters and current limits."""
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "in_flight": self.in_flight,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity
+        }
+    
+    def close(self):
+        """Close the client and stop the loop thread."""
+        with self._lock:
+            if self._loop is None:
+                return
+            loop, self._loop = self._loop, None
+        for worker in self._workers:
+            loop.loop.call_soon_threadsafe(worker.cancel)
+        loop.run(self._client.close())
+        loop.stop()
+
+
+_dispatcher: Optional[OpenAIDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> OpenAIDispatcher:
+    """Process-wide dispatcher shared by every OpenAI caller."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = OpenAIDispatcher()
+        return _dispatcher
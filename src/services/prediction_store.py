@@ -0,0 +1,106 @@
+"""
+Prediction store - precomputed per-sport results served as versioned snapshots.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionSnapshot:
+    """An immutable precomputed result for one sport."""
+    
+    def __init__(self, sport: str, version: int, data: Dict):
+        """Initialize prediction snapshot."""
+        self.sport = sport
+        self.version = version
+        self.data = data
+        self.computed_at = datetime.utcnow()
+        self.checked_at = self.computed_at
+        self._created = time.monotonic()
+        self._checked = self._created
+    
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since the snapshot was computed."""
+        return time.monotonic() - self._created
+    
+    @property
+    def unchecked_seconds(self) -> float:
+        """Seconds since the snapshot was last confirmed against live odds."""
+        return time.monotonic() - self._checked
+
+
+class PredictionStore:
+    """Latest snapshot per sport, swapped atomically on each refresh.
+    
+    Readers get a reference to an immutable snapshot, so serving never waits
+    on a refresh in progress.
+    """
+    
+    def __init__(self, max_age: Optional[float] = None):
+        """Initialize prediction store."""
+        # Snapshots older than this are still served but flagged stale
+        self.max_age = max_age or float(os.getenv("PREDICTION_STORE_MAX_AGE_SECONDS", 600))
+        self._snapshots: Dict[str, PredictionSnapshot] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def put(self, sport: str, data: Dict) -> PredictionSnapshot:
+        """Publish a new snapshot for a sport."""
+        with self._lock:
+            version = self._versions.get(sport, 0) + 1
+            self._versions[sport] = version
+            snapshot = PredictionSnapshot(sport, version, data)
+            self._snapshots[sport] = snapshot
+        logger.info(f"Prediction snapshot {sport} v{version} stored")
+        return snapshot
+    
+    def peek(self, sport: str) -> Optional[PredictionSnapshot]:
+        """Latest snapshot without counting a read (for the refresher)."""
+        return self._snapshots.get(sport)
+    
+    def mark_checked(self, sport: str):
+        """Record that the odds have not moved since the snapshot was computed."""
+        snapshot = self._snapshots.get(sport)
+        if snapshot is not None:
+            snapshot.checked_at = datetime.utcnow()
+            snapshot._checked = time.monotonic()
+    
+    def get(self, sport: str) -> Optional[PredictionSnapshot]:
+        """Latest snapshot for a sport, if any."""
+        snapshot = self._snapshots.get(sport)
+        if snapshot is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return snapshot
+    
+    def metadata(self, snapshot: PredictionSnapshot) -> Dict:
+        """Staleness metadata attached to served responses."""
+        return {
+            "version": snapshot.version,
+            "computed_at": snapshot.computed_at.isoformat(),
+            "checked_at": snapshot.checked_at.isoformat(),
+            "age_seconds": round(snapshot.age_seconds, 3),
+            "stale": snapshot.unchecked_seconds > self.max_age
+        }
+    
+    def get_stats(self) -> Dict:
+        """Get snapshot versions, ages and hit counters."""
+        snapshots = dict(self._snapshots)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sports": {
+                sport: {"version": s.version, "age_seconds": round(s.age_seconds, 1)}
+                for sport, s in snapshots.items()
+            }
+        }
@@ -0,0 +1,106 @@
+"""
+Read-through cache for Firestore queries, keyed by query fingerprint.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCache:
+    """TTL + LRU cache of query results, invalidated by tag (e.g. sport).
+    
+    Loader exceptions propagate and are never cached, so a failed query is
+    retried on the next call instead of serving an empty result for a TTL.
+    """
+    
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """Initialize query cache."""
+        self.ttl = ttl if ttl is not None else float(os.getenv("FIRESTORE_QUERY_CACHE_TTL_SECONDS", 300))
+        self.max_entries = max_entries or int(os.getenv("FIRESTORE_QUERY_CACHE_MAX_ENTRIES", 1000))
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        """Stable fingerprint for a query's collection, filters and limits."""
+        encoded = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()
+    
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Return a cached result, running loader on a miss or expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        
+        value = loader()
+        
+        with self._lock:
+            # A write landed while loading; don't cache a possibly stale result
+            if generation != self._generation:
+                return value
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+    
+    def invalidate(self, tag: str):
+        """Drop every cached result tagged with tag."""
+        with self._lock:
+            self._generation += 1
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self.invalidations += 1
+    
+    def clear(self):
+        """Drop everything."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+    
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Shared by every FirestoreClient in the process so writes through one client
+# invalidate reads cached by another (e.g. the monitor's client)
+query_cache = QueryCache()
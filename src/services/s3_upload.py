@@ -3,31 +3,41 @@ AWS S3 operations for storing voice summaries and audio files.
 """
 
 import os
-import boto3
-from typing import Optional
+import queue
+import threading
+from typing import Iterable, Optional
 import logging
 
+from services.aws import get_s3_client, get_transfer_config
+
 logger = logging.getLogger(__name__)
 
+# S3 rejects multipart parts smaller than this (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
 
 class S3Manager:
     """Manages AWS S3 operations for audio files."""
     
     def __init__(self):
         """Initialize S3 client."""
+        # Point at a local S3 stand-in (MinIO, moto server) when set
+        self.endpoint_url = os.getenv("AWS_S3_ENDPOINT_URL") or None
+        self.part_size = max(int(os.getenv("S3_PART_SIZE_BYTES", MIN_PART_SIZE)), MIN_PART_SIZE)
+        self.max_queued_parts = int(os.getenv("S3_UPLOAD_QUEUE_PARTS", 2))
+        self.bucket = os.getenv("AWS_S3_BUCKET", "rovnic-voice-summaries")
         try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                region_name='us-east-1'
-            )
-            self.bucket = os.getenv("AWS_S3_BUCKET", "rovnic-voice-summaries")
-            logger.info("S3 client initialized")
+            self.s3_client = get_s3_client()
         except Exception as e:
             logger.error(f"S3 initialization error: {str(e)}")
             self.s3_client = None
     
+    def public_url(self, s3_key: str) -> str:
+        """Public URL for an object in the bucket."""
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{s3_key}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{s3_key}"
+    
     def upload_file(self, file_path: str, s3_key: str) -> Optional[str]:
         """Upload file to S3 and return public URL."""
         if self.s3_client is None:
@@ -39,17 +49,18 @@ class S3Manager:
                 file_path,
                 self.bucket,
                 s3_key,
-                ExtraArgs={'ContentType': 'audio/mpeg', 'ACL': 'public-read'}
+                ExtraArgs={'ContentType': 'audio/mpeg', 'ACL': 'public-read'},
+                Config=get_transfer_config()
             )
             
-            url = f"https://{self.bucket}.s3.amazonaws.com/{s3_key}"
+            url = self.public_url(s3_key)
             logger.info(f"File uploaded: {url}")
             return url
         except Exception as e:
             logger.error(f"Error uploading file: {str(e)}")
             return None
     
-    def upload_bytes(self, file_bytes: bytes, s3_key: str) -> Optional[str]:
+    def upload_bytes(self, file_bytes: bytes, s3_key: str, content_type: str = 'audio/mpeg') -> Optional[str]:
         """Upload bytes to S3."""
         if self.s3_client is None:
             return None
@@ -59,17 +70,132 @@ class S3Manager:
                 Bucket=self.bucket,
                 Key=s3_key,
                 Body=file_bytes,
-                ContentType='audio/mpeg',
+                ContentType=content_type,
                 ACL='public-read'
             )
             
-            url = f"https://{self.bucket}.s3.amazonaws.com/{s3_key}"
+            url = self.public_url(s3_key)
             logger.info(f"Bytes uploaded: {url}")
             return url
         except Exception as e:
             logger.error(f"Error uploading bytes: {str(e)}")
             return None
     
+    def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        s3_key: str,
+        content_type: str = 'audio/mpeg',
+        part_size: Optional[int] = None
+    ) -> Optional[str]:
+        """Upload byte chunks as they are produced and return the public URL.
+        
+        Once a full part has arrived, chunks are cut into parts that a
+        background thread uploads through a bounded queue, so uploading
+        overlaps production and memory stays at a few parts whatever the total
+        size. Payloads smaller than one part (5 MB at least, which covers
+        typical TTS clips) are buffered and go up with a single put_object
+        when the stream ends: a single-request upload needs its full length,
+        and only the last multipart part may be under 5 MB. A failed
+        multipart upload is aborted.
+        """
+        if self.s3_client is None:
+            return None
+        
+        part_size = max(part_size or self.part_size, MIN_PART_SIZE)
+        chunks = iter(chunks)
+        buffer = bytearray()
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= part_size:
+                    break
+            else:
+                return self.upload_bytes(bytes(buffer), s3_key, content_type)
+        except Exception as e:
+            logger.error(f"Error reading upload stream for {s3_key}: {str(e)}")
+            return None
+        
+        upload_id = None
+        try:
+            upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=s3_key,
+                ContentType=content_type,
+                ACL='public-read'
+            )["UploadId"]
+            parts = self._upload_parts(chunks, buffer, s3_key, upload_id, part_size)
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+            
+            url = self.public_url(s3_key)
+            logger.info(f"Stream uploaded in {len(parts)} parts: {url}")
+            return url
+        except Exception as e:
+            logger.error(f"Error streaming upload to {s3_key}: {str(e)}")
+            if upload_id is not None:
+                try:
+                    self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=s3_key, UploadId=upload_id)
+                except Exception as abort_error:
+                    logger.warning(f"Failed to abort multipart upload {upload_id}: {str(abort_error)}")
+            return None
+    
+    def _upload_parts(self, chunks, buffer: bytearray, s3_key: str, upload_id: str, part_size: int) -> list:
+        """Cut the stream into parts and upload them on a worker thread."""
+        pending: queue.Queue = queue.Queue(maxsize=self.max_queued_parts)
+        uploaded = []
+        errors = []
+        
+        def uploader():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                if errors:
+                    continue
+                number, body = item
+                try:
+                    response = self.s3_client.upload_part(
+                        Bucket=self.bucket,
+                        Key=s3_key,
+                        UploadId=upload_id,
+                        PartNumber=number,
+                        Body=body
+                    )
+                    uploaded.append({"PartNumber": number, "ETag": response["ETag"]})
+                except Exception as e:
+                    errors.append(e)
+        
+        thread = threading.Thread(target=uploader, name="s3-multipart", daemon=True)
+        thread.start()
+        number = 0
+        try:
+            while True:
+                while len(buffer) >= part_size:
+                    number += 1
+                    pending.put((number, bytes(buffer[:part_size])))
+                    del buffer[:part_size]
+                if errors:
+                    break
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                buffer += chunk
+            if buffer and not errors:
+                number += 1
+                pending.put((number, bytes(buffer)))
+        finally:
+            pending.put(None)
+            thread.join()
+        
+        if errors:
+            raise errors[0]
+        return sorted(uploaded, key=lambda part: part["PartNumber"])
+    
     def delete_file(self, s3_key: str) -> bool:
         """Delete file from S3."""
         if self.s3_client is None:
@@ -0,0 +1,129 @@
+"""
+Settlement - grades stored predictions against completed game scores.
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureScoresClient:
+    """Offline stand-in for the scores endpoint, reading {dir}/{sport}.json."""
+    
+    def __init__(self, fixture_dir: str):
+        """Initialize fixture scores client."""
+        self.fixture_dir = Path(fixture_dir)
+    
+    def get_scores(self, sport: str, days_from: int = 1) -> List[Dict]:
+        """Load recorded scores for a sport."""
+        path = self.fixture_dir / f"{sport.lower()}.json"
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Error reading scores fixture {path}: {str(e)}")
+            return []
+    
+    def get_all_scores(self, sports: Optional[List[str]] = None, days_from: int = 1) -> Dict[str, List]:
+        """Load recorded scores for several sports."""
+        return {sport: self.get_scores(sport, days_from) for sport in sports or []}
+
+
+def game_result(game: Dict) -> Optional[Dict]:
+    """Final score of a completed game from a scores payload, or None."""
+    if not game.get("completed") or not game.get("scores"):
+        return None
+    
+    points = {}
+    for entry in game["scores"]:
+        try:
+            points[entry.get("name")] = float(entry.get("score"))
+        except (TypeError, ValueError):
+            return None
+    
+    home = points.get(game.get("home_team"))
+    away = points.get(game.get("away_team"))
+    if home is None or away is None:
+        return None
+    return {"home_score": home, "away_score": away, "home_win": home > away, "draw": home == away}
+
+
+class SettlementEngine:
+    """Fetches completed scores in bulk and settles matching predictions.
+    
+    Scores are matched to predictions through the prediction_index collection
+    (one batched read per sport). A sport's games are then settled in chunked
+    Firestore transactions that claim the index entries, record the outcomes
+    and increment the daily accuracy counters, so a game is counted once even
+    when the scheduler and /admin/settle overlap. Predictions are home Win or
+    Loss, so drawn games are voided: closed without grading.
+    """
+    
+    def __init__(self, db, scores_client=None, days_from: Optional[int] = None):
+        """Initialize settlement engine."""
+        self.db = db
+        # Recorded fixtures take precedence so offline runs never spend quota
+        fixture_dir = os.getenv("SCORES_FIXTURE_DIR")
+        if fixture_dir:
+            logger.info(f"Settling from recorded scores in {fixture_dir}")
+            scores_client = FixtureScoresClient(fixture_dir)
+        self.scores_client = scores_client
+        self.days_from = days_from or int(os.getenv("SETTLEMENT_DAYS_FROM", 3))
+    
+    def settle_sport(self, sport: str, games: List[Dict]) -> Dict:
+        """Settle one sport's predictions from its scores payload."""
+        completed = {}
+        for game in games:
+            result = game_result(game)
+            if result is not None and game.get("id"):
+                completed[game["id"]] = result
+        
+        index = self.db.get_prediction_index(list(completed))
+        settlements = []
+        for event_id, entry in index.items():
+            if entry.get("settled") or not entry.get("path"):
+                continue
+            
+            result = completed[event_id]
+            is_correct = None if result["draw"] else (entry.get("prediction") == "Win") == result["home_win"]
+            settlements.append((event_id, entry, {**result, "correct": is_correct}))
+        
+        claimed = set(self.db.settle_predictions(settlements))
+        graded = [outcome["correct"] for event_id, _, outcome in settlements if event_id in claimed]
+        return {
+            "completed_games": len(completed),
+            "matched": len(index),
+            "settled": sum(1 for c in graded if c is not None),
+            "correct": sum(1 for c in graded if c),
+            "voided": sum(1 for c in graded if c is None)
+        }
+    
+    def settle_all(self, sports: List[str], scores: Optional[Dict[str, List]] = None) -> Dict:
+        """Settle every sport with one concurrent scores fetch, then flush writes.
+        
+        Callers with their own (e.g. async) scores client can pass pre-fetched
+        scores keyed by sport.
+        """
+        start = time.perf_counter()
+        if scores is None:
+            scores = self.scores_client.get_all_scores(sports, self.days_from)
+        
+        results = {}
+        for sport in sports:
+            try:
+                results[sport] = self.settle_sport(sport, scores.get(sport) or [])
+            except Exception as e:
+                logger.error(f"Error settling {sport}: {str(e)}")
+                results[sport] = {"error": str(e)}
+        
+        self.db.flush()
+        elapsed = time.perf_counter() - start
+        total = sum(r.get("settled", 0) for r in results.values())
+        logger.info(f"Settled {total} predictions across {len(sports)} sports in {elapsed:.2f}s")
+        return {"sports": results, "settled": total, "elapsed_seconds": round(elapsed, 3)}
@@ -0,0 +1,107 @@
+"""
+Stream hub - fans out prediction and odds updates to SSE/WebSocket subscribers.
+"""
+
+import os
+import asyncio
+import itertools
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One connected client: a bounded queue that drops its oldest message when full."""
+    
+    def __init__(self, sport: str, maxsize: int):
+        """Initialize subscription."""
+        self.sport = sport
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    def offer(self, message: Dict):
+        """Enqueue without blocking the publisher; a slow client loses old messages."""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(message)
+
+
+class StreamHub:
+    """In-process pub/sub keyed by sport.
+    
+    Publishing never waits on subscribers: each one has its own bounded queue,
+    so one stalled dashboard cannot slow the pipeline or other clients.
+    """
+    
+    def __init__(self, queue_size: Optional[int] = None, heartbeat: Optional[float] = None):
+        """Initialize stream hub."""
+        self.queue_size = queue_size or int(os.getenv("STREAM_QUEUE_SIZE", 100))
+        self.heartbeat = heartbeat or float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+        self.max_subscribers = int(os.getenv("STREAM_MAX_SUBSCRIBERS", 10000))
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self.published = 0
+    
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the event loop that owns subscriber queues."""
+        self._loop = loop
+    
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers across all sports."""
+        return sum(len(subs) for subs in self._subscribers.values())
+    
+    def subscribe(self, sport: str) -> Optional[Subscription]:
+        """Register a subscriber for a sport, or None when at capacity."""
+        if self.subscriber_count >= self.max_subscribers:
+            return None
+        subscription = Subscription(sport, self.queue_size)
+        self._subscribers.setdefault(sport, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber."""
+        self._subscribers.get(subscription.sport, set()).discard(subscription)
+    
+    def publish(self, sport: str, event_type: str, data: Dict):
+        """Broadcast a message to a sport's subscribers (call on the hub's loop)."""
+        message = {
+            "id": next(self._ids),
+            "type": event_type,
+            "sport": sport,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        self.published += 1
+        for subscription in list(self._subscribers.get(sport, ())):
+            subscription.offer(message)
+    
+    def publish_threadsafe(self, sport: str, event_type: str, data: Dict):
+        """Broadcast from a non-loop thread (e.g. a Firestore listener)."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self.publish, sport, event_type, data)
+    
+    async def listen(self, subscription: Subscription) -> AsyncIterator[Optional[Dict]]:
+        """Yield messages for a subscriber, or None when a heartbeat is due."""
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+    
+    def get_stats(self) -> Dict:
+        """Get subscriber and delivery counters."""
+        subscriptions = [s for subs in self._subscribers.values() for s in subs]
+        return {
+            "subscribers": len(subscriptions),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in subscriptions)
+        }
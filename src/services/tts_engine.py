@@ -3,13 +3,16 @@ TTS Engine - Convert text to speech and upload to S3.
 """
 
 import os
-import openai
-import boto3
-import uuid
-from pathlib import Path
-from typing import Optional
+import hashlib
+import threading
+from botocore.exceptions import ClientError
+from collections import OrderedDict
+from typing import Dict, Optional
 import logging
 
+from services.openai_dispatcher import get_dispatcher
+from services.s3_upload import S3Manager
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,55 +21,141 @@ class TTSEngine:
     
     def __init__(self):
         """Initialize TTS engine."""
-        try:
-            self.api_key = os.getenv("OPENAI_API_KEY")
-            openai.api_key = self.api_key
-            
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                region_name='us-east-1'
-            )
-            self.bucket = os.getenv("AWS_S3_BUCKET", "rovnic-voice-summaries")
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.dispatcher = get_dispatcher()
+        self.model = os.getenv("TTS_MODEL", "tts-1")
+        self.voice = os.getenv("TTS_VOICE", "alloy")
+        # Longest summary sent to speech synthesis (the API accepts up to 4096)
+        self.max_chars = int(os.getenv("TTS_MAX_CHARS", 4096))
+        self.index_max_entries = int(os.getenv("TTS_INDEX_MAX_ENTRIES", 10000))
+        self._index: "OrderedDict[str, str]" = OrderedDict()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.index_hits = 0
+        self.s3_hits = 0
+        self.synthesized = 0
+        self.failures = 0
+        
+        self.storage = S3Manager()
+        self.s3_client = self.storage.s3_client
+        self.bucket = self.storage.bucket
+        if self.s3_client is not None:
             logger.info("TTS engine initialized")
-        except Exception as e:
-            logger.error(f"TTS initialization error: {str(e)}")
-            self.s3_client = None
+    
+    def normalize_text(self, text: str) -> str:
+        """Text as it will be spoken: truncated and whitespace-collapsed."""
+        return " ".join(text[:self.max_chars].split())
+    
+    def audio_key(self, text: str) -> str:
+        """Content-addressed S3 key for text spoken with this voice and model."""
+        digest = hashlib.sha256(
+            f"{self.model}|{self.voice}|{self.normalize_text(text)}".encode()
+        ).hexdigest()
+        return f"audio/{digest[:2]}/{digest}.mp3"
+    
+    def _url(self, file_key: str) -> str:
+        """Public URL for an object in the audio bucket."""
+        return self.storage.public_url(file_key)
+    
+    def lookup(self, text: str) -> Optional[str]:
+        """URL of already-stored audio for text, from the local index only."""
+        with self._lock:
+            return self._index.get(self.audio_key(text))
+    
+    def _exists(self, file_key: str) -> bool:
+        """Whether an object is already stored under a key."""
+        try:
+            self.s3_client.head_object(Bucket=self.bucket, Key=file_key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                logger.warning(f"S3 head_object failed for {file_key}: {str(e)}")
+            return False
+    
+    def _remember(self, file_key: str, url: str):
+        """Record a stored object in the local index."""
+        with self._lock:
+            self._index[file_key] = url
+            self._index.move_to_end(file_key)
+            while len(self._index) > self.index_max_entries:
+                self._index.popitem(last=False)
+    
+    def _key_lock(self, file_key: str) -> threading.Lock:
+        """Per-key lock so concurrent identical requests synthesize once."""
+        with self._lock:
+            return self._key_locks.setdefault(file_key, threading.Lock())
     
     def generate_voice(self, text: str, sport: str) -> Optional[str]:
-        """Generate voice from text and upload to S3."""
+        """Generate voice from text and upload to S3, reusing identical audio."""
         if not text or not self.api_key:
             logger.warning("Missing text or API key")
             return None
+        if not self.s3_client:
+            logger.warning("S3 client not available")
+            return None
         
-        try:
-            # Generate speech
-            logger.info(f"Generating voice for {sport}...")
-            response = openai.audio.speech.create(
-                model="tts-1",
-                voice="alloy",
-                input=text[:500]  # Limit to 500 chars
-            )
-            
-            # Upload to S3
-            if self.s3_client:
-                file_key = f"{sport.lower()}/{uuid.uuid4().hex[:8]}.mp3"
-                self.s3_client.put_object(
-                    Bucket=self.bucket,
-                    Key=file_key,
-                    Body=response.content,
-                    ContentType="audio/mpeg",
-                    ACL="public-read"
+        file_key = self.audio_key(text)
+        with self._lock:
+            self.requests += 1
+            url = self._index.get(file_key)
+            if url is not None:
+                self._index.move_to_end(file_key)
+                self.index_hits += 1
+                return url
+        
+        with self._key_lock(file_key):
+            try:
+                # Another thread may have produced it while we waited
+                with self._lock:
+                    url = self._index.get(file_key)
+                if url is not None:
+                    with self._lock:
+                        self.index_hits += 1
+                    return url
+                
+                if self._exists(file_key):
+                    url = self._url(file_key)
+                    self._remember(file_key, url)
+                    with self._lock:
+                        self.s3_hits += 1
+                    logger.info(f"Reusing stored voice for {sport}: {url}")
+                    return url
+                
+                # True miss: stream synthesis into the upload (overlapping only past one part)
+                logger.info(f"Generating voice for {sport}...")
+                audio = self.dispatcher.stream_speech(
+                    model=self.model,
+                    voice=self.voice,
+                    input=self.normalize_text(text)
                 )
                 
-                url = f"https://{self.bucket}.s3.amazonaws.com/{file_key}"
+                url = self.storage.upload_stream(audio, file_key, content_type="audio/mpeg")
+                if url is None:
+                    raise RuntimeError(f"upload of {file_key} failed")
+                self._remember(file_key, url)
+                with self._lock:
+                    self.synthesized += 1
                 logger.info(f"Voice generated and uploaded: {url}")
                 return url
-            else:
-                logger.warning("S3 client not available")
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                logger.error(f"TTS error: {str(e)}")
                 return None
-                
-        except Exception as e:
-            logger.error(f"TTS error: {str(e)}")
-            return None
+            finally:
+                with self._lock:
+                    self._key_locks.pop(file_key, None)
+    
+    def get_stats(self) -> Dict:
+        """Get dedup counters; dedup_ratio is the share of requests served without synthesis."""
+        with self._lock:
+            reused = self.index_hits + self.s3_hits
+            return {
+                "requests": self.requests,
+                "index_hits": self.index_hits,
+                "s3_hits": self.s3_hits,
+                "synthesized": self.synthesized,
+                "failures": self.failures,
+                "dedup_ratio": reused / self.requests if self.requests else 0.0
+            }
@@ -0,0 +1,274 @@
+"""
+TTS queue - generates voice summaries in the background and patches them onto predictions.
+"""
+
+import os
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import logging
+
+from utils.rate_limit import TokenBucket, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+def summary_text(prediction: Dict, analysis: Optional[str]) -> str:
+    """Text spoken in a prediction's voice summary."""
+    return f"Prediction: {prediction.get('prediction')} with {prediction.get('confidence'):.1%} confidence. {analysis or ''}".strip()
+
+
+class TTSJob:
+    """One voice summary to synthesize and attach to a stored prediction."""
+    
+    def __init__(self, sport: str, text: str, path: str, event_id: Optional[str] = None):
+        """Initialize TTS job."""
+        self.sport = sport
+        self.text = text
+        self.path = path
+        self.event_id = event_id
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.enqueued_at = time.monotonic()
+    
+    def to_dict(self) -> Dict:
+        """Serializable view for dead-letter inspection."""
+        return {
+            "sport": self.sport,
+            "path": self.path,
+            "event_id": self.event_id,
+            "attempts": self.attempts,
+            "error": self.error
+        }
+
+
+class TTSQueue:
+    """Bounded job queue drained by a small pool of TTS worker threads.
+    
+    Predictions are saved without audio; a worker synthesizes the summary and
+    merges audio_url into the stored document when it is ready. Syntheses are
+    paced by a token bucket sized to the account's TTS requests per minute.
+    Failed jobs are retried with backoff and then moved to a dead-letter list.
+    """
+    
+    def __init__(
+        self,
+        engine,
+        db,
+        workers: Optional[int] = None,
+        max_size: Optional[int] = None,
+        on_complete: Optional[Callable[[TTSJob, str], None]] = None
+    ):
+        """Initialize TTS queue."""
+        self.engine = engine
+        self.db = db
+        self.on_complete = on_complete
+        self.workers = workers or int(os.getenv("TTS_WORKERS", 4))
+        self.max_attempts = int(os.getenv("TTS_MAX_ATTEMPTS", 3))
+        rpm = float(os.getenv("OPENAI_TTS_RPM_LIMIT", 50))
+        self.rate = TokenBucket(rate=rpm / 60, capacity=max(1, self.workers))
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size or int(os.getenv("TTS_QUEUE_SIZE", 500)))
+        self._dead: deque = deque(maxlen=int(os.getenv("TTS_DEAD_LETTER_MAX", 100)))
+        self._threads: List[threading.Thread] = []
+        # Jobs waiting out a retry backoff, with the timer that will requeue them
+        self._retrying: Dict[TTSJob, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.in_progress = 0
+        self.last_latency = 0.0
+    
+    def _ensure_workers(self):
+        """Start the worker threads on first use (lock held)."""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"tts-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def enqueue(self, sport: str, text: str, path: str, event_id: Optional[str] = None) -> bool:
+        """Queue a voice summary; returns False if the queue is full or closed."""
+        if not text or not path:
+            return False
+        with self._lock:
+            if self._closed:
+                return False
+            self._ensure_workers()
+        try:
+            self._queue.put_nowait(TTSJob(sport, text, path, event_id))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.warning(f"TTS queue full, dropping voice summary for {path}")
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+    
+    def _run(self):
+        """Worker loop: synthesize, patch the prediction, retry or dead-letter."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            with self._lock:
+                self.in_progress += 1
+            try:
+                self._process(job)
+            finally:
+                with self._lock:
+                    self.in_progress -= 1
+                self._queue.task_done()
+    
+    def _process(self, job: TTSJob):
+        """Handle one attempt of a job."""
+        job.attempts += 1
+        try:
+            url = self.engine.lookup(job.text)
+            if url is None:
+                # Only real syntheses spend TTS rate budget
+                self.rate.acquire_sync(1)
+                url = self.engine.generate_voice(job.text, job.sport)
+            if url is None:
+                raise RuntimeError("voice generation failed")
+            fields = {"audio_url": url, "audio_generated_at": datetime.utcnow().isoformat()}
+            if not self.db.update_prediction(job.path, fields, event_id=job.event_id):
+                raise RuntimeError("prediction update failed")
+        except Exception as e:
+            job.error = str(e)
+            self._retry_or_dead_letter(job)
+            return
+        
+        with self._lock:
+            self.completed += 1
+            self.last_latency = time.monotonic() - job.enqueued_at
+        logger.info(f"Voice summary attached to {job.path}")
+        if self.on_complete is not None:
+            try:
+                self.on_complete(job, url)
+            except Exception as e:
+                logger.warning(f"TTS completion callback failed: {str(e)}")
+    
+    def _retry_or_dead_letter(self, job: TTSJob):
+        """Requeue a failed job after backoff, or park it once attempts run out."""
+        with self._lock:
+            if job.attempts >= self.max_attempts or self._closed:
+                self.dead_lettered += 1
+                self._dead.append(job)
+                logger.error(f"TTS job dead-lettered after {job.attempts} attempts: {job.path} ({job.error})")
+                return
+            self.retried += 1
+            delay = backoff_delay(job.attempts - 1, base=2, cap=60)
+            timer = threading.Timer(delay, self._requeue, (job,))
+            timer.daemon = True
+            self._retrying[job] = timer
+            timer.start()
+        logger.warning(f"TTS job for {job.path} failed ({job.error}), retrying in {delay:.1f}s")
+    
+    def _requeue(self, job: TTSJob):
+        """Put a retried job back on the queue."""
+        with self._lock:
+            if self._retrying.pop(job, None) is None:
+                # Already dead-lettered by close()
+                return
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            job.error = "queue full on retry"
+            self._dead_letter([job])
+    
+    def _dead_letter(self, jobs: List[TTSJob]):
+        """Park jobs on the dead-letter list."""
+        with self._lock:
+            self.dead_lettered += len(jobs)
+            self._dead.extend(jobs)
+    
+    def dead_letters(self) -> List[Dict]:
+        """Jobs that exhausted their retries or were cut off by close(), oldest first."""
+        with self._lock:
+            return [job.to_dict() for job in self._dead]
+    
+    def retry_dead_letters(self) -> int:
+        """Move every dead-lettered job back onto the queue."""
+        with self._lock:
+            jobs = list(self._dead)
+            self._dead.clear()
+        requeued = 0
+        for job in jobs:
+            if self.enqueue(job.sport, job.text, job.path, job.event_id):
+                requeued += 1
+        return requeued
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queue is empty and no job is in progress."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                retrying = bool(self._retrying)
+            if not retrying and self._queue.unfinished_tasks == 0:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+    
+    def close(self, timeout: Optional[float] = None):
+        """Finish queued jobs (up to timeout) and stop the workers.
+        
+        Jobs still waiting to be retried or run when the timeout expires are
+        moved to the dead-letter list rather than silently dropped.
+        """
+        self.join(timeout)
+        with self._lock:
+            self._closed = True
+            threads = list(self._threads)
+            pending = list(self._retrying)
+            for timer in self._retrying.values():
+                timer.cancel()
+            self._retrying.clear()
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if job is not None:
+                pending.append(job)
+        
+        if pending:
+            for job in pending:
+                job.error = job.error or "not run before shutdown"
+            self._dead_letter(pending)
+            logger.error(
+                f"TTS queue closed with {len(pending)} unfinished voice summaries dead-lettered: "
+                f"{', '.join(job.path for job in pending)}"
+            )
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+    
+    def get_stats(self) -> Dict:
+        """Get queue depth, worker and outcome counters."""
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "workers": len(self._threads),
+                "in_progress": self.in_progress,
+                "enqueued": self.enqueued,
+                "completed": self.completed,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "dead_lettered": self.dead_lettered,
+                "dead_letter_size": len(self._dead),
+                "last_latency_seconds": round(self.last_latency, 3),
+                "engine": self.engine.get_stats()
+            }
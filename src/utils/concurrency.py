@@ -0,0 +1,110 @@
+"""
+Concurrency helpers: per-upstream in-flight limits and background event loops.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+# Default in-flight caps per upstream (override with <NAME>_MAX_CONCURRENCY)
+DEFAULT_UPSTREAM_LIMITS = {
+    "odds_api": 4,
+    "openai": 4,
+    "firestore": 8,
+    "model": 2,
+    "shutdown": 2,
+}
+
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_executors: Dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def upstream_limit(name: str) -> int:
+    """Get the configured concurrency cap for an upstream."""
+    default = DEFAULT_UPSTREAM_LIMITS.get(name, 4)
+    return max(1, int(os.getenv(f"{name.upper()}_MAX_CONCURRENCY", default)))
+
+
+def _get_semaphore(name: str) -> threading.BoundedSemaphore:
+    """Get or create the semaphore guarding an upstream."""
+    with _lock:
+        if name not in _semaphores:
+            _semaphores[name] = threading.BoundedSemaphore(upstream_limit(name))
+        return _semaphores[name]
+
+
+@contextmanager
+def upstream_slot(name: str):
+    """Hold one in-flight slot for an upstream while the block runs."""
+    semaphore = _get_semaphore(name)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def get_executor(name: str) -> concurrent.futures.ThreadPoolExecutor:
+    """Get or create the bounded thread pool for a blocking dependency."""
+    with _lock:
+        if name not in _executors:
+            _executors[name] = concurrent.futures.ThreadPoolExecutor(
+                max_workers=upstream_limit(name),
+                thread_name_prefix=f"blocking-{name}"
+            )
+        return _executors[name]
+
+
+async def run_blocking(name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run sync code for a dependency in its own pool, off the event loop.
+    
+    Each dependency gets a separate pool sized by <NAME>_MAX_CONCURRENCY, so a
+    slow OpenAI call can only tie up OpenAI workers, never the loop or the
+    Firestore/model pools.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(name), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = False):
+    """Stop every dependency pool."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class BackgroundLoop:
+    """Runs an asyncio event loop on a daemon thread for sync callers."""
+    
+    def __init__(self, name: str = "background-loop"):
+        """Start the loop thread."""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Thread target: run the loop forever."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block until it returns."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+    
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def stop(self):
+        """Stop the loop and join its thread."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,84 @@
+"""
+Token bucket and jittered backoff helpers for rate-limited upstreams.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for a zero-based retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens/second."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        """Add tokens earned since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def configure(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        """Change refill rate and/or capacity, keeping earned tokens."""
+        with self._lock:
+            self._refill()
+            if rate is not None:
+                self.rate = max(0.0, rate)
+            if capacity is not None:
+                self.capacity = capacity
+                self.tokens = min(self.tokens, capacity)
+    
+    def cap_tokens(self, limit: float):
+        """Never hold more tokens than the upstream says are left."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, max(0.0, limit))
+    
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Take tokens if available; otherwise return seconds until they will be."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            if self.rate <= 0:
+                return float("inf")
+            return (amount - self.tokens) / self.rate
+    
+    async def acquire(self, amount: float = 1.0, max_wait: Optional[float] = None) -> bool:
+        """Wait for tokens on the running loop; False if max_wait would be exceeded."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(amount)
+            if wait == 0.0:
+                return True
+            if max_wait is not None and waited + wait > max_wait:
+                return False
+            await asyncio.sleep(wait)
+            waited += wait
+    
+    def acquire_sync(self, amount: float = 1.0, max_wait: Optional[float] = None) -> bool:
+        """Blocking variant of acquire for worker threads."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(amount)
+            if wait == 0.0:
+                return True
+            if max_wait is not None and waited + wait > max_wait:
+                return False
+            time.sleep(wait)
+            waited += wait
@@ -0,0 +1,5 @@
+"""
+Shared pytest setup: importing the src package puts src/ on sys.path.
+"""
+
+import src  # noqa: F401
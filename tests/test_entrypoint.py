@@ -0,0 +1,49 @@
+"""
+Smoke tests for the shipped entrypoints.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SERVE_SCRIPT = """
+from fastapi.testclient import TestClient
+from src.api_server import app
+
+with TestClient(app) as client:
+    assert client.get("/health").status_code == 200
+    assert client.get("/predict", params={"sport": "curling"}).status_code == 404
+    assert client.post("/admin/settle", params={"sport": "curling"}).status_code == 404
+"""
+
+
+def _run(code: str, cwd: Path, **env) -> subprocess.CompletedProcess:
+    """Run a snippet with only the repo root (not src/) importable."""
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT), **env},
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+
+
+def test_api_server_imports_as_package(tmp_path):
+    """The Dockerfile runs `uvicorn src.api_server:app` with src/ off the path."""
+    result = _run("import src.api_server as api; assert api.hub is not None", tmp_path)
+    assert result.returncode == 0, result.stderr
+
+
+def test_api_server_starts_and_shuts_down_as_package(tmp_path):
+    """Startup, a request and the run_blocking shutdown path under the Docker entrypoint."""
+    result = _run(
+        SERVE_SCRIPT,
+        tmp_path,
+        PREDICTION_REFRESH_ENABLED="false",
+        STREAM_WATCH_FIRESTORE="false"
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,49 @@
+"""
+Tests for batched inference.
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from services.ml_pipeline import MLPipeline
+from services.model_registry import ModelBundle
+
+
+class StaticRegistry:
+    """Registry that always serves one bundle."""
+    
+    def __init__(self, bundle):
+        """Initialize static registry."""
+        self.bundle = bundle
+    
+    def get(self, sport):
+        """Return the bundle for any sport."""
+        return self.bundle
+
+
+def _pipeline(tmp_path, labels) -> MLPipeline:
+    """Pipeline whose registry model was trained on the given labels."""
+    X = np.random.default_rng(0).normal(size=(len(labels), 10))
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(scaler.transform(X), labels)
+    bundle = ModelBundle("nba", "v1", model, scaler, {}, 0)
+    return MLPipeline(str(tmp_path / "model.pkl"), registry=StaticRegistry(bundle))
+
+
+def test_single_class_model_returns_error(tmp_path):
+    """predict_proba with one column is reported, not raised."""
+    pipeline = _pipeline(tmp_path, [1] * 20)
+    
+    batch = pipeline.predict_batch(np.zeros((3, 10)), "nba")
+    assert "error" in batch
+    assert "error" in pipeline.predict([0.0] * 10, "nba")
+
+
+def test_two_class_model_predicts_slate(tmp_path):
+    """A normal model returns columnar win/lose probabilities."""
+    pipeline = _pipeline(tmp_path, [0, 1] * 10)
+    
+    batch = pipeline.predict_batch(np.zeros((3, 10)), "nba")
+    assert batch["win"].shape == (3,)
+    assert np.allclose(batch["win"] + batch["lose"], 1.0)
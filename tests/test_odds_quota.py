@@ -0,0 +1,46 @@
+"""
+Tests for Odds API quota budgeting.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from services.odds_api import AsyncOddsAPIClient
+from services.odds_cache import OddsCache
+from services.odds_quota import OddsQuotaManager, _seconds_until_reset
+
+
+def test_cache_ttl_follows_budget_above_configured_floor():
+    """The quota stretches the TTL when the budget is tight but never shortens it below the setting."""
+    client = AsyncOddsAPIClient(cache=OddsCache(ttl=60))
+    client.quota.min_interval = 30
+    
+    client.quota.max_interval = 45
+    assert client.cache_ttl("nba") == 60
+    
+    client.quota.max_interval = 3600
+    assert client.cache_ttl("nba") == pytest.approx(client.quota.refresh_interval("nba"))
+    assert client.cache_ttl("nba") > 60
+
+
+@pytest.mark.parametrize("now, expected", [
+    (datetime(2026, 1, 31, 12, tzinfo=timezone.utc), datetime(2026, 2, 28, tzinfo=timezone.utc)),
+    (datetime(2028, 1, 31, 12, tzinfo=timezone.utc), datetime(2028, 2, 29, tzinfo=timezone.utc)),
+    (datetime(2026, 2, 15, tzinfo=timezone.utc), datetime(2026, 2, 28, tzinfo=timezone.utc)),
+    (datetime(2026, 2, 28, 6, tzinfo=timezone.utc), datetime(2026, 3, 31, tzinfo=timezone.utc)),
+    (datetime(2026, 3, 31, 12, tzinfo=timezone.utc), datetime(2026, 4, 30, tzinfo=timezone.utc)),
+    (datetime(2026, 4, 10, tzinfo=timezone.utc), datetime(2026, 4, 30, tzinfo=timezone.utc)),
+    (datetime(2026, 12, 31, 12, tzinfo=timezone.utc), datetime(2027, 1, 31, tzinfo=timezone.utc)),
+])
+def test_reset_day_31_clamps_to_short_months(now, expected):
+    """A reset day past the end of the month resets on that month's last day."""
+    assert _seconds_until_reset(31, now) == (expected - now).total_seconds()
+
+
+def test_reset_day_past_month_end_does_not_break_acquire(monkeypatch):
+    """Bucket creation survives ODDS_API_QUOTA_RESET_DAY=31."""
+    monkeypatch.setenv("ODDS_API_QUOTA_RESET_DAY", "31")
+    quota = OddsQuotaManager()
+    assert asyncio.run(quota.acquire("key", 3))
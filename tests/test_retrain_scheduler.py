@@ -0,0 +1,83 @@
+"""
+Tests for the retrain process pool.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from agents import retrain_scheduler
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# What a spawned worker does with the parent's __main__ module (it inherits
+# the parent's sys.path, which has src/ first under `python src/main.py`)
+SPAWN_REIMPORT = """
+import runpy, sys, threading
+sys.path.insert(0, {src!r})
+before = threading.active_count()
+module = runpy.run_path({main!r}, run_name="__mp_main__")
+assert module["db"] is None and module["tts_queue"] is None, "services were created"
+assert threading.active_count() == before, "background threads were started"
+"""
+
+
+def test_spawned_worker_does_not_start_main_services(tmp_path):
+    """Re-importing main.py in a retrain worker must not build clients or threads."""
+    result = subprocess.run(
+        [sys.executable, "-c", SPAWN_REIMPORT.format(src=str(SRC_DIR), main=str(SRC_DIR / "main.py"))],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def _slow_retrain(sport: str, progress) -> dict:
+    """Stand-in worker that keeps reporting progress for a while."""
+    for step in range(20):
+        progress[sport] = {"step": f"step {step}"}
+        time.sleep(0.1)
+    return {"status": "completed"}
+
+
+class StatusDB:
+    """Records every persisted retrain status."""
+    
+    def __init__(self):
+        """Initialize status db."""
+        self.saved = []
+    
+    def save_retrain_status(self, sport, status):
+        """Record the status."""
+        self.saved.append((sport, status["status"]))
+        return True
+
+
+def test_shutdown_without_wait_lets_running_workers_report(monkeypatch):
+    """Queued jobs are cancelled, running ones are marked interrupted and still finish cleanly."""
+    monkeypatch.setattr(retrain_scheduler, "_run_retrain", _slow_retrain)
+    monkeypatch.setenv("RETRAIN_MAX_WORKERS", "1")
+    db = StatusDB()
+    scheduler = retrain_scheduler.RetrainScheduler(db)
+    scheduler.submit("nba")
+    scheduler.submit("nfl")
+    
+    deadline = time.monotonic() + 60
+    while scheduler.status("nba").get("status") != "running":
+        assert time.monotonic() < deadline, "worker never started"
+        time.sleep(0.05)
+    
+    scheduler.shutdown(wait=False)
+    assert ("nba", "interrupted") in db.saved
+    
+    for thread in threading.enumerate():
+        if thread.name == "retrain-shutdown":
+            thread.join(60)
+    final = dict(db.saved)
+    assert final["nba"] == "completed"
+    # Already handed to the pool's call queue, so it may run rather than be cancelled
+    assert final["nfl"] in ("cancelled", "completed")
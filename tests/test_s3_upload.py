@@ -0,0 +1,79 @@
+"""
+Tests for streamed S3 uploads.
+"""
+
+import threading
+
+from services.s3_upload import MIN_PART_SIZE, S3Manager
+
+CHUNK = 64 * 1024
+
+
+class RecordingS3:
+    """Fake S3 client that logs calls alongside the producer's progress."""
+    
+    def __init__(self, events):
+        """Initialize recording client."""
+        self.events = events
+        self.lock = threading.Lock()
+    
+    def _log(self, event):
+        """Append an event in arrival order."""
+        with self.lock:
+            self.events.append(event)
+    
+    def put_object(self, **kwargs):
+        """Single-request upload."""
+        self._log(("put_object", len(kwargs["Body"])))
+    
+    def create_multipart_upload(self, **kwargs):
+        """Start a multipart upload."""
+        self._log(("create",))
+        return {"UploadId": "u1"}
+    
+    def upload_part(self, **kwargs):
+        """Upload one part."""
+        self._log(("part", kwargs["PartNumber"]))
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+    
+    def complete_multipart_upload(self, **kwargs):
+        """Finish a multipart upload."""
+        self._log(("complete", len(kwargs["MultipartUpload"]["Parts"])))
+
+
+def _manager(events) -> S3Manager:
+    """S3Manager wired to the recording client."""
+    manager = S3Manager.__new__(S3Manager)
+    manager.endpoint_url = None
+    manager.bucket = "test"
+    manager.part_size = MIN_PART_SIZE
+    manager.max_queued_parts = 2
+    manager.s3_client = RecordingS3(events)
+    return manager
+
+
+def _produce(events, size: int):
+    """Audio chunks that log each one as it is handed over."""
+    for n in range(0, size, CHUNK):
+        events.append(("chunk", n // CHUNK))
+        yield b"\0" * min(CHUNK, size - n)
+    events.append(("end",))
+
+
+def test_multi_part_stream_uploads_while_producing():
+    """Part 1 is uploaded before the producer has finished."""
+    events = []
+    url = _manager(events).upload_stream(_produce(events, 3 * MIN_PART_SIZE + CHUNK), "a.mp3")
+    
+    assert url is not None
+    assert events.index(("part", 1)) < events.index(("end",))
+    assert events[-1] == ("complete", 4)
+
+
+def test_typical_clip_is_one_put_after_synthesis():
+    """A clip under one part (a few hundred KB of speech) is a single put_object at the end."""
+    events = []
+    url = _manager(events).upload_stream(_produce(events, 300 * 1024), "b.mp3")
+    
+    assert url is not None
+    assert events[-2:] == [("end",), ("put_object", 300 * 1024)]
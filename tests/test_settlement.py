@@ -0,0 +1,106 @@
+"""
+Tests for settlement: quota reserve and game grading.
+"""
+
+import asyncio
+import os
+
+import httpx
+
+from services.odds_api import AsyncOddsAPIClient, SPORT_KEYS
+from services.settlement import SettlementEngine, game_result
+
+SPORTS = list(SPORT_KEYS)
+CYCLE_SECONDS = 4 * 3600
+
+
+class FakeDB:
+    """Prediction index where every completed game has an open prediction."""
+    
+    def __init__(self, prediction: str = "Win"):
+        """Initialize fake db."""
+        self.prediction = prediction
+        self.settled = []
+    
+    def get_prediction_index(self, event_ids):
+        """Every game was predicted the same way."""
+        return {
+            event_id: {"path": f"predictions/{event_id}", "sport": "soccer", "prediction": self.prediction}
+            for event_id in event_ids
+        }
+    
+    def settle_predictions(self, settlements):
+        """Record the settlements."""
+        self.settled.extend(settlements)
+        return [event_id for event_id, _, _ in settlements]
+    
+    def flush(self):
+        """Nothing buffered."""
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    """Mock Odds API: one game per sport, already final on the scores endpoint."""
+    sport_key = request.url.path.split("/")[-2]
+    game = {
+        "id": f"{sport_key}-1",
+        "home_team": "Home",
+        "away_team": "Away",
+        "commence_time": "2026-01-01T00:00:00Z"
+    }
+    if request.url.path.endswith("/scores"):
+        game.update(completed=True, scores=[{"name": "Home", "score": "3"}, {"name": "Away", "score": "1"}])
+    return httpx.Response(200, json=[game], headers={"x-requests-remaining": "19000"})
+
+
+def test_default_cycle_settles_every_sport(monkeypatch):
+    """Odds refreshes for all sports never leave settlement without credits."""
+    for name in list(os.environ):
+        if name.startswith(("ODDS_API_", "ODDS_REFRESH_", "SCORES_")):
+            monkeypatch.delenv(name)
+    
+    async def run_cycles():
+        client = AsyncOddsAPIClient(cache=None)
+        client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(_handler))
+        results = []
+        for cycle in range(3):
+            if cycle:
+                # Let one scheduler interval of refill accrue
+                for bucket in client.quota.buckets.values():
+                    bucket.updated -= CYCLE_SECONDS
+            odds = await asyncio.gather(*(client.get_odds(sport) for sport in SPORTS))
+            assert all(odds)
+            scores = await client.get_all_scores(SPORTS, days_from=3)
+            results.append(SettlementEngine(FakeDB()).settle_all(SPORTS, scores=scores))
+        await client.aclose()
+        return results
+    
+    for result in asyncio.run(run_cycles()):
+        assert {sport: r["settled"] for sport, r in result["sports"].items()} == {sport: 1 for sport in SPORTS}
+
+
+def _final(home: str, away: str) -> dict:
+    """A completed game's scores payload."""
+    return {
+        "id": "g1",
+        "home_team": "Home",
+        "away_team": "Away",
+        "completed": True,
+        "scores": [{"name": "Home", "score": home}, {"name": "Away", "score": away}]
+    }
+
+
+def test_draw_is_voided_not_graded():
+    """A draw is neither a correct Loss call nor a wrong Win call."""
+    assert game_result(_final("1", "1"))["draw"] is True
+    
+    for prediction in ("Win", "Loss"):
+        db = FakeDB(prediction)
+        result = SettlementEngine(db).settle_sport("soccer", [_final("1", "1")])
+        assert (result["settled"], result["correct"], result["voided"]) == (0, 0, 1)
+        assert db.settled[0][2]["correct"] is None
+
+
+def test_decided_game_is_graded():
+    """Home wins grade Win as correct and Loss as wrong."""
+    assert SettlementEngine(FakeDB("Win")).settle_sport("soccer", [_final("2", "1")])["correct"] == 1
+    assert SettlementEngine(FakeDB("Loss")).settle_sport("soccer", [_final("2", "1")])["correct"] == 0